@@ -3,223 +3,351 @@ Admin API for managing exercise library
 Allows admins to CRUD exercises
 """
 
-from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash
-import json
+from flask import Blueprint, current_app, request, g
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+from functools import wraps
+from sqlalchemy import exists, func, insert, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import load_only
+from app import db, User
+from models import (
+    BreakRequest, Configuration, Exercise, MemberWeeklyGoal,
+    Notification, ProgressCheckRequest, SiteSettings, TrainingActionNote, TrainingProgram, UserProfile,
+)
+from services.passwords import hash_password
+from services.upsert import upsert_insert
+from services.ttl_cache import TTLCache
+from services.json_response import json_response, dumps_text, json_loads, stream_json_list, etag_response
+from services.response_cache import cached_response, invalidate as invalidate_cached
+from services.role_cache import lookup_role, set_cached_role
+from services.training_programs import delete_program_dependents
+from services.validation import is_valid_email
+from services.session_phases import EMPTY_SESSION_PHASES, load_session_phases
+from pydantic import BaseModel, ConfigDict, ValidationError
+from typing import List, Optional, Union
+from datetime import datetime
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    ijson = None
+    HAS_IJSON = False
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
-def get_db():
-    """Get database instance from current app context"""
-    return current_app.extensions.get('sqlalchemy') or current_app.extensions['sqlalchemy']
+# Default / maximum page size for ?cursor=&limit= paging of the member and assistant lists
+LIST_PAGE_SIZE = 100
+MAX_LIST_PAGE_SIZE = 500
+
+# Rows per INSERT batch in bulk_create_exercises
+BULK_INSERT_BATCH_SIZE = 1000
+# Rows fetched per round trip when streaming an export
+STREAM_BATCH_SIZE = 200
+
+
+class ExerciseUpdate(BaseModel):
+    """Exercise fields an admin may set (PUT). Unknown keys are ignored."""
+    model_config = ConfigDict(extra='ignore')
+
+    category: Optional[str] = None
+    name_fa: Optional[str] = None
+    name_en: Optional[str] = None
+    target_muscle_fa: Optional[str] = None
+    target_muscle_en: Optional[str] = None
+    level: Optional[str] = None
+    intensity: Optional[str] = None
+    gender_suitability: Optional[str] = None
+    execution_tips_fa: Optional[str] = None
+    execution_tips_en: Optional[str] = None
+    breathing_guide_fa: Optional[str] = None
+    breathing_guide_en: Optional[str] = None
+    injury_contraindications: Optional[Union[List[str], str]] = None
+    equipment_needed_fa: Optional[str] = None
+    equipment_needed_en: Optional[str] = None
+    video_url: Optional[str] = None
+    image_url: Optional[str] = None
+    voice_url: Optional[str] = None
+    trainer_notes_fa: Optional[str] = None
+    trainer_notes_en: Optional[str] = None
+    note_notify_at_seconds: Optional[int] = None
+    ask_post_set_questions: Optional[bool] = None
+
+
+class ExerciseIn(ExerciseUpdate):
+    """Payload for creating an exercise (POST and bulk). Unknown keys are rejected."""
+    model_config = ConfigDict(extra='forbid')
+
+    id: Optional[int] = None
+    category: str
+    name_fa: str
+    name_en: str
+    target_muscle_fa: str
+    target_muscle_en: str
+    level: str
+    intensity: str
+    gender_suitability: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+def _exercise_values(payload):
+    """Column values from a validated payload (only keys the client sent)."""
+    values = payload.model_dump(exclude_unset=True)
+    if isinstance(values.get('injury_contraindications'), list):
+        values['injury_contraindications'] = dumps_text(values['injury_contraindications'])
+    return values
+
+
+def _validation_message(exc):
+    """Flatten a pydantic ValidationError into one readable line."""
+    return '; '.join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'body'}: {err['msg']}" for err in exc.errors()
+    )
+
+# Fields the training-movement-info PATCH may set on an exercise
+_MOVEMENT_INFO_FIELDS = ('video_url', 'voice_url', 'trainer_notes_fa', 'trainer_notes_en', 'note_notify_at_seconds', 'ask_post_set_questions')
 
-def get_user_model():
-    """Get User model from app"""
-    from app import User
-    return User
+# Profile columns a profile update may set (keys and timestamps are managed server-side)
+_PROFILE_UPDATE_COLUMNS = frozenset(c.name for c in UserProfile.__table__.columns) - {'id', 'user_id', 'updated_at'}
 
-def get_exercise_model():
-    """Get Exercise model from models"""
-    from models import Exercise
-    return Exercise
+# (category, level) -> exercise count for the paginated list; cleared on exercise writes
+_exercise_count_cache = TTLCache(maxsize=256, ttl=60)
 
-def get_userprofile_model():
-    """Get UserProfile model from models"""
-    from models import UserProfile
-    return UserProfile
+def get_user_role(user_id):
+    """Return the role of a user (None if not found). Cached briefly per user id."""
+    try:
+        user_id_int = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    # Resolved once per request; later checks in the same request reuse it
+    cached = g.get('_user_role')
+    if cached is not None and cached[0] == user_id_int:
+        return cached[1]
+    role = lookup_role(user_id_int) or None
+    g._user_role = (user_id_int, role)
+    return role
+
+
+def _keyset_page(query, id_column):
+    """Apply ?cursor=<last id>&limit=<n> keyset paging to query.
+    Returns (rows, next_cursor, paged); without either parameter all rows are returned and
+    paged is False so the endpoint keeps its plain-array response for existing callers."""
+    cursor = request.args.get('cursor', type=int)
+    limit = request.args.get('limit', type=int)
+    if cursor is None and limit is None:
+        return query.all(), None, False
+    limit = max(1, min(limit or LIST_PAGE_SIZE, MAX_LIST_PAGE_SIZE))
+    query = query.order_by(id_column)
+    if cursor:
+        query = query.filter(id_column > cursor)
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1].id, True
+    return rows, None, True
+
+def _usernames_by_id(user_ids):
+    """id -> username for the given ids in one IN query (instead of one User load per row)."""
+    if not user_ids:
+        return {}
+    return dict(db.session.execute(select(User.id, User.username).where(User.id.in_(user_ids))).all())
 
 def is_admin(user_id):
     """Check if user is admin"""
-    db = get_db()
-    User = get_user_model()
-    user_id_int = int(user_id) if isinstance(user_id, str) else user_id
-    user = db.session.get(User, user_id_int)
-    if not user:
-        return False
-    return user.role == 'admin'
+    return get_user_role(user_id) == 'admin'
 
 def is_admin_or_assistant(user_id):
     """Check if user is admin or assistant"""
-    db = get_db()
-    User = get_user_model()
-    user_id_int = int(user_id) if isinstance(user_id, str) else user_id
-    user = db.session.get(User, user_id_int)
-    if not user:
-        return False
-    return user.role in ['admin', 'assistant']
+    return get_user_role(user_id) in ('admin', 'assistant')
+
+# Endpoints any signed-in user may call; everything else in this blueprint is admin/assistant only
+_OPEN_ENDPOINTS = frozenset({'admin.check_admin', 'admin.check_profile_complete'})
+
+@admin_bp.before_request
+def _require_staff():
+    """Authenticate and reject non-staff once per request, before view dispatch."""
+    if request.method == 'OPTIONS' or request.endpoint in _OPEN_ENDPOINTS:
+        return None
+    verify_jwt_in_request()
+    if not is_admin_or_assistant(get_jwt_identity()):
+        return json_response({'error': 'Unauthorized'}, 403)
+    return None
+
+def admin_required(fn):
+    """Restrict a view to admins (the blueprint guard has already verified the JWT)."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not is_admin(get_jwt_identity()):
+            return json_response({'error': 'Unauthorized'}, 403)
+        return fn(*args, **kwargs)
+    return wrapper
 
 @admin_bp.route('/exercises', methods=['GET'])
-@jwt_required()
+@admin_required
+@etag_response()
+@cached_response('exercises')
 def get_all_exercises():
     """Get all exercises with pagination and filters"""
-    db = get_db()
-    Exercise = get_exercise_model()
-    user_id = get_jwt_identity()
-    
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     # Get query parameters
     category = request.args.get('category')
     level = request.args.get('level')
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 50, type=int)
+    # Keyset cursor: last id of the previous page (after_id is accepted as an alias)
+    cursor = request.args.get('cursor', type=int)
+    if cursor is None:
+        cursor = request.args.get('after_id', type=int)
+    summary = request.args.get('view') == 'summary'
+    to_dict = Exercise.to_summary_dict if summary else Exercise.to_dict
     
     # Build query
-    query = db.session.query(Exercise)
+    if summary:
+        # List view only needs a handful of columns: select them as plain rows (no ORM
+        # instances, no large text fields); to_summary_dict reads them by attribute
+        query = db.session.query(*(getattr(Exercise, c) for c in Exercise.SUMMARY_COLUMNS))
+    else:
+        query = db.session.query(Exercise)
     
     if category:
         query = query.filter_by(category=category)
     if level:
         query = query.filter_by(level=level)
     
-    # Paginate manually
-    total = query.count()
+    if request.args.get('format') == 'stream':
+        # Full export: rows are fetched 200 at a time and written out as they are serialized
+        rows = query.order_by(Exercise.id).yield_per(STREAM_BATCH_SIZE)
+        return stream_json_list('exercises', (to_dict(ex, 'fa') for ex in rows))
+    
+    if cursor is not None:
+        # Keyset pagination: seek past the last seen id, no COUNT(*) and no OFFSET scan
+        query = query.order_by(Exercise.id)
+        if cursor > 0:
+            query = query.filter(Exercise.id > cursor)
+        exercises = query.limit(per_page + 1).all()
+        has_more = len(exercises) > per_page
+        exercises = exercises[:per_page]
+        return json_response({
+            'exercises': [to_dict(ex, 'fa') for ex in exercises],
+            'next_cursor': exercises[-1].id if has_more else None
+        })
+    
+    # Paginate manually; the COUNT(*) per filter combination is cached briefly
+    count_key = (category or '', level or '')
+    total = _exercise_count_cache.get(count_key)
+    if total is None:
+        total = query.count()
+        _exercise_count_cache.set(count_key, total)
     exercises = query.offset((page - 1) * per_page).limit(per_page).all()
     pages = (total + per_page - 1) // per_page
     
-    return jsonify({
-        'exercises': [ex.to_dict('fa') for ex in exercises],
+    return json_response({
+        'exercises': [to_dict(ex, 'fa') for ex in exercises],
         'total': total,
         'pages': pages,
-        'current_page': page
-    }), 200
+        'current_page': page,
+        'has_next': page < pages
+    })
 
 @admin_bp.route('/exercises/<int:exercise_id>', methods=['GET'])
-@jwt_required()
+@admin_required
+@etag_response()
 def get_exercise(exercise_id):
     """Get a single exercise by ID"""
-    Exercise = get_exercise_model()
-    user_id = get_jwt_identity()
-    
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    db = get_db()
-    exercise = db.session.query(Exercise).filter_by(id=exercise_id).first()
+    exercise = db.session.get(Exercise, exercise_id)
     if not exercise:
-        return jsonify({'error': 'Exercise not found'}), 404
-    return jsonify(exercise.to_dict('fa')), 200
+        return json_response({'error': 'Exercise not found'}, 404)
+    return json_response(exercise.to_dict('fa'))
 
 @admin_bp.route('/exercises', methods=['POST'])
-@jwt_required()
+@admin_required
 def create_exercise():
     """Create a new exercise"""
-    db = get_db()
-    Exercise = get_exercise_model()
-    user_id = get_jwt_identity()
-    
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    data = request.get_json()
-    
-    # Validate required fields
-    required_fields = ['category', 'name_fa', 'name_en', 'target_muscle_fa', 'target_muscle_en', 
-                       'level', 'intensity', 'gender_suitability']
-    for field in required_fields:
-        if field not in data:
-            return jsonify({'error': f'Missing required field: {field}'}), 400
-    
-    # Handle injury_contraindications
-    if 'injury_contraindications' in data and isinstance(data['injury_contraindications'], list):
-        data['injury_contraindications'] = json.dumps(data['injury_contraindications'], ensure_ascii=False)
+    try:
+        data = _exercise_values(ExerciseIn.model_validate(request.get_json()))
+    except ValidationError as e:
+        return json_response({'error': _validation_message(e)}, 400)
     
     try:
-        exercise = Exercise(**data)
-        db.session.add(exercise)
+        # INSERT ... RETURNING hydrates the row in the same round trip; serialize
+        # before commit so the expired instance is not re-SELECTed afterwards
+        exercise = db.session.scalars(insert(Exercise).returning(Exercise), [data]).one()
+        result = exercise.to_dict('fa')
         db.session.commit()
+        invalidate_cached('exercises')
+        _exercise_count_cache.clear()
         try:
             from services.website_kb import trigger_kb_reindex_async
             trigger_kb_reindex_async()
         except Exception:
             pass
-        return jsonify(exercise.to_dict('fa')), 201
+        return json_response(result, 201)
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 @admin_bp.route('/exercises/<int:exercise_id>', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_exercise(exercise_id):
     """Update an existing exercise"""
-    Exercise = get_exercise_model()
-    user_id = get_jwt_identity()
-    
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    db = get_db()
-    exercise = db.session.query(Exercise).filter_by(id=exercise_id).first()
+    exercise = db.session.get(Exercise, exercise_id)
     if not exercise:
-        return jsonify({'error': 'Exercise not found'}), 404
-    data = request.get_json()
-    
-    # Handle injury_contraindications
-    if 'injury_contraindications' in data and isinstance(data['injury_contraindications'], list):
-        data['injury_contraindications'] = json.dumps(data['injury_contraindications'], ensure_ascii=False)
+        return json_response({'error': 'Exercise not found'}, 404)
+    try:
+        data = _exercise_values(ExerciseUpdate.model_validate(request.get_json()))
+    except ValidationError as e:
+        return json_response({'error': _validation_message(e)}, 400)
     
     # Update fields
     for key, value in data.items():
-        if hasattr(exercise, key):
-            setattr(exercise, key, value)
+        setattr(exercise, key, value)
     
     try:
         db.session.commit()
+        invalidate_cached('exercises')
+        _exercise_count_cache.clear()
         try:
             from services.website_kb import trigger_kb_reindex_async
             trigger_kb_reindex_async()
         except Exception:
             pass
-        return jsonify(exercise.to_dict('fa')), 200
+        return json_response(exercise.to_dict('fa'))
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 @admin_bp.route('/exercises/<int:exercise_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_exercise(exercise_id):
     """Delete an exercise"""
-    Exercise = get_exercise_model()
-    user_id = get_jwt_identity()
-    
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    db = get_db()
-    exercise = db.session.query(Exercise).filter_by(id=exercise_id).first()
+    exercise = db.session.get(Exercise, exercise_id)
     if not exercise:
-        return jsonify({'error': 'Exercise not found'}), 404
+        return json_response({'error': 'Exercise not found'}, 404)
     
     try:
         db.session.delete(exercise)
         db.session.commit()
+        invalidate_cached('exercises')
+        _exercise_count_cache.clear()
         try:
             from services.website_kb import trigger_kb_reindex_async
             trigger_kb_reindex_async()
         except Exception:
             pass
-        return jsonify({'message': 'Exercise deleted successfully'}), 200
+        return json_response({'message': 'Exercise deleted successfully'})
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 @admin_bp.route('/exercises/<int:exercise_id>/movement-info', methods=['PATCH'])
-@jwt_required()
 def update_exercise_movement_info(exercise_id):
     """Update only video/voice/trainer notes for an exercise (training movement info)."""
-    db = get_db()
-    Exercise = get_exercise_model()
-    user_id = get_jwt_identity()
-    if not is_admin_or_assistant(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    exercise = db.session.query(Exercise).filter_by(id=exercise_id).first()
+    exercise = db.session.get(Exercise, exercise_id)
     if not exercise:
-        return jsonify({'error': 'Exercise not found'}), 404
+        return json_response({'error': 'Exercise not found'}, 404)
     data = request.get_json() or {}
-    for key in ('video_url', 'voice_url', 'trainer_notes_fa', 'trainer_notes_en', 'note_notify_at_seconds', 'ask_post_set_questions'):
-        if key in data and hasattr(exercise, key):
+    for key in _MOVEMENT_INFO_FIELDS:
+        if key in data:
             val = data[key]
             if key == 'note_notify_at_seconds':
                 try:
@@ -232,66 +360,58 @@ def update_exercise_movement_info(exercise_id):
                 setattr(exercise, key, (val.strip() if isinstance(val, str) else val) or None)
     try:
         db.session.commit()
+        invalidate_cached('exercises')
         try:
             from services.website_kb import trigger_kb_reindex_async
             trigger_kb_reindex_async()
         except Exception:
             pass
-        return jsonify(exercise.to_dict('fa')), 200
+        return json_response(exercise.to_dict('fa'))
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 
 @admin_bp.route('/exercises/video-upload', methods=['POST'])
-@jwt_required()
 def upload_exercise_video():
     """Upload a video file for an exercise; returns { video_url: ... }."""
     user_id = get_jwt_identity()
-    if not is_admin_or_assistant(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
     from werkzeug.utils import secure_filename
     import os
     from datetime import datetime
     if 'file' not in request.files:
-        return jsonify({'error': 'No file provided'}), 400
+        return json_response({'error': 'No file provided'}, 400)
     file = request.files['file']
     if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
+        return json_response({'error': 'No file selected'}, 400)
     ext = (file.filename.rsplit('.', 1)[-1].lower() if '.' in file.filename else '') or 'mp4'
     if ext not in ('mp4', 'webm', 'mov', 'avi', 'mkv'):
-        return jsonify({'error': 'Invalid file type. Allowed: mp4, webm, mov, avi, mkv'}), 400
+        return json_response({'error': 'Invalid file type. Allowed: mp4, webm, mov, avi, mkv'}, 400)
     upload_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads', 'exercises', 'videos')
     os.makedirs(upload_dir, exist_ok=True)
     filename = secure_filename(f"video_{user_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{ext}")
     filepath = os.path.join(upload_dir, filename)
     file.save(filepath)
     video_url = f'/api/uploads/exercises/videos/{filename}'
-    return jsonify({'video_url': video_url, 'filename': filename}), 200
+    return json_response({'video_url': video_url, 'filename': filename})
 
 
 @admin_bp.route('/exercises/<int:exercise_id>/propagate-notes', methods=['POST'])
-@jwt_required()
 def propagate_exercise_notes(exercise_id):
     """Copy this exercise's trainer notes (and voice) to all programs that contain this movement.
     Sets TrainingActionNote for every (program_id, session_index, exercise_index) where the
     exercise name matches. Voice/text is set once on the movement and added to members' training program."""
-    db = get_db()
     user_id = get_jwt_identity()
-    if not is_admin_or_assistant(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    from models import TrainingProgram, TrainingActionNote
-    Exercise = get_exercise_model()
-    exercise = db.session.query(Exercise).filter_by(id=exercise_id).first()
+    exercise = db.session.get(Exercise, exercise_id)
     if not exercise:
-        return jsonify({'error': 'Exercise not found'}), 404
+        return json_response({'error': 'Exercise not found'}, 404)
     name_fa = (exercise.name_fa or '').strip()
     name_en = (exercise.name_en or '').strip()
     note_fa = exercise.trainer_notes_fa or ''
     note_en = exercise.trainer_notes_en or ''
     voice_url = exercise.voice_url or ''
     if not name_fa and not name_en:
-        return jsonify({'error': 'Exercise has no name'}), 400
+        return json_response({'error': 'Exercise has no name'}, 400)
     programs = db.session.query(TrainingProgram).all()
     updated = 0
     for program in programs:
@@ -325,164 +445,189 @@ def propagate_exercise_notes(exercise_id):
                     updated += 1
     try:
         db.session.commit()
-        return jsonify({'message': 'Notes propagated to programs', 'updated_count': updated}), 200
+        return json_response({'message': 'Notes propagated to programs', 'updated_count': updated})
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 
 @admin_bp.route('/exercises/voice-upload', methods=['POST'])
-@jwt_required()
 def upload_exercise_voice():
     """Upload a voice note for an exercise; returns { voice_url: ... }."""
     user_id = get_jwt_identity()
-    if not is_admin_or_assistant(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
     from werkzeug.utils import secure_filename
     import os
     from datetime import datetime
     if 'file' not in request.files:
-        return jsonify({'error': 'No file provided'}), 400
+        return json_response({'error': 'No file provided'}, 400)
     file = request.files['file']
     if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
+        return json_response({'error': 'No file selected'}, 400)
     ext = (file.filename.rsplit('.', 1)[-1].lower() if '.' in file.filename else '') or 'webm'
     if ext not in ('webm', 'mp3', 'ogg', 'wav', 'm4a'):
-        return jsonify({'error': 'Invalid file type. Allowed: webm, mp3, ogg, wav, m4a'}), 400
+        return json_response({'error': 'Invalid file type. Allowed: webm, mp3, ogg, wav, m4a'}, 400)
     upload_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads', 'exercises', 'voice')
     os.makedirs(upload_dir, exist_ok=True)
     filename = secure_filename(f"voice_{user_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{ext}")
     filepath = os.path.join(upload_dir, filename)
     file.save(filepath)
     voice_url = f'/api/uploads/exercises/voice/{filename}'
-    return jsonify({'voice_url': voice_url, 'filename': filename}), 200
+    return json_response({'voice_url': voice_url, 'filename': filename})
 
 
 @admin_bp.route('/exercises/bulk', methods=['POST'])
-@jwt_required()
+@admin_required
 def bulk_create_exercises():
     """Bulk create exercises"""
-    Exercise = get_exercise_model()
-    user_id = get_jwt_identity()
-    
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    data = request.get_json()
-    exercises_data = data.get('exercises', [])
-    
-    if not exercises_data:
-        return jsonify({'error': 'No exercises provided'}), 400
-    
+    exercise_insert = Exercise.__table__.insert()
     created = []
     errors = []
-    
-    db = get_db()
-    for idx, ex_data in enumerate(exercises_data):
-        try:
-            # Handle injury_contraindications
-            if 'injury_contraindications' in ex_data and isinstance(ex_data['injury_contraindications'], list):
-                ex_data['injury_contraindications'] = json.dumps(ex_data['injury_contraindications'], ensure_ascii=False)
-            
-            exercise = Exercise(**ex_data)
-            db.session.add(exercise)
-            created.append(ex_data.get('name_fa', f'Exercise {idx+1}'))
-        except Exception as e:
-            errors.append(f'Exercise {idx+1}: {str(e)}')
+    batch = []
+    batch_first = 0
+    total = 0
     
     try:
+        for idx, ex_data in enumerate(_iter_bulk_exercises()):
+            total += 1
+            # Validate up front; the INSERT itself runs in batches
+            try:
+                ex_data = _exercise_values(ExerciseIn.model_validate(ex_data))
+            except ValidationError as e:
+                errors.append(f'Exercise {idx+1}: {_validation_message(e)}')
+                continue
+            if not batch:
+                batch_first = idx + 1
+            batch.append(ex_data)
+            if len(batch) >= BULK_INSERT_BATCH_SIZE:
+                _insert_exercise_batch(exercise_insert, batch, batch_first, idx + 1, created, errors)
+                batch = []
+        
+        if not total:
+            return json_response({'error': 'No exercises provided'}, 400)
+        if batch:
+            _insert_exercise_batch(exercise_insert, batch, batch_first, total, created, errors)
         db.session.commit()
+        invalidate_cached('exercises')
+        _exercise_count_cache.clear()
         try:
             from services.website_kb import trigger_kb_reindex_async
             trigger_kb_reindex_async()
         except Exception:
             pass
-        return jsonify({
+        return json_response({
             'message': f'Created {len(created)} exercises',
             'created': created,
             'errors': errors
-        }), 201
+        }, 201)
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
+
+def _insert_exercise_batch(insert_stmt, batch, first, last, created, errors):
+    """Insert one batch inside a SAVEPOINT so a failing batch is reported and skipped
+    without discarding the batches already written in this transaction.
+    Core executemany on the table: no ORM objects are built (column defaults still apply)."""
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert_stmt, batch)
+    except SQLAlchemyError as e:
+        errors.append(f'Exercises {first}-{last}: {getattr(e, "orig", None) or e}')
+        return
+    created.extend(row.get('name_fa') for row in batch)
+
+class _BodyReader:
+    """File-like view of the request body for ijson. ijson probes its input with read(0), which
+    Werkzeug's LimitedStream treats as a client disconnect (ClientDisconnected -> 400)."""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def read(self, size=-1):
+        if size == 0:
+            return b''
+        return self._stream.read(size)
+
+def _iter_bulk_exercises():
+    """Yield items of the request's "exercises" array.
+    Streams the body with ijson when installed so memory is bounded by the batch size."""
+    if HAS_IJSON:
+        return ijson.items(_BodyReader(request.stream), 'exercises.item', use_float=True)
+    data = request.get_json() or {}
+    return iter(data.get('exercises') or [])
 
 @admin_bp.route('/check-admin', methods=['GET'])
 @jwt_required()
+@etag_response()
 def check_admin():
     """Check if current user is admin"""
     try:
-        db = get_db()
-        User = get_user_model()
         user_id = get_jwt_identity()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
-        
-        user_id_int = int(user_id)
-        user = db.session.get(User, user_id_int)
+            return json_response({'error': 'Invalid token'}, 401)
         
-        if not user:
-            return jsonify({
-                'is_admin': False,
-                'role': None
-            }), 200
-        
-        return jsonify({
-            'is_admin': is_admin(user_id),
-            'role': user.role
-        }), 200
+        # One role lookup (token claim / role cache) instead of loading the User row
+        role = get_user_role(user_id)
+        return json_response({
+            'is_admin': role == 'admin',
+            'role': role
+        })
     except Exception as e:
         import traceback
         print(f"Error in check_admin: {e}")
         print(traceback.format_exc())
-        return jsonify({
+        return json_response({
             'is_admin': False,
             'role': None,
             'error': str(e)
-        }), 500
+        }, 500)
 
 # ==================== Assistant Management ====================
 
 @admin_bp.route('/assistants', methods=['GET'])
-@jwt_required()
+@admin_required
+@etag_response()
+@cached_response('assistants')
 def get_assistants():
     """Get all assistants (admin only) - shows assistants created by current admin"""
-    db = get_db()
-    UserProfile = get_userprofile_model()
-    user_id = get_jwt_identity()
-    
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    User = get_user_model()
     # Get assistants - for now, all assistants (can be filtered by created_by if needed)
-    assistants = db.session.query(User).filter_by(role='assistant').all()
+    # Only the columns the list returns (skips password_hash, timestamps, ...)
+    assistants, next_cursor, paged = _keyset_page(
+        db.session.query(User).options(
+            load_only(User.id, User.username, User.email, User.role)
+        ).filter_by(role='assistant'),
+        User.id
+    )
+    assistant_ids = [a.id for a in assistants]
+    # Profiles and member counts for all assistants in two queries instead of two per assistant
+    account_types = dict(
+        db.session.query(UserProfile.user_id, UserProfile.account_type)
+        .filter(UserProfile.user_id.in_(assistant_ids)).all()
+    ) if assistant_ids else {}
+    member_counts = dict(
+        db.session.query(User.assigned_to, func.count(User.id))
+        .filter(User.assigned_to.in_(assistant_ids)).group_by(User.assigned_to).all()
+    ) if assistant_ids else {}
     assistants_data = []
     for assistant in assistants:
-        profile = db.session.query(UserProfile).filter_by(user_id=assistant.id).first()
         assistants_data.append({
             'id': assistant.id,
             'username': assistant.username,
             'email': assistant.email,
             'role': assistant.role,
-            'assigned_members_count': db.session.query(User).filter_by(assigned_to=assistant.id).count(),
-            'profile_complete': profile is not None and profile.account_type == 'assistant',
+            'assigned_members_count': member_counts.get(assistant.id, 0),
+            'profile_complete': account_types.get(assistant.id) == 'assistant',
             # Note: Password cannot be retrieved after hashing, so it's not included
             # Admin should save credentials when creating assistant
         })
     
-    return jsonify(assistants_data), 200
+    if paged:
+        return json_response({'items': assistants_data, 'next_cursor': next_cursor})
+    return json_response(assistants_data)
 
 @admin_bp.route('/assistants', methods=['POST'])
-@jwt_required()
+@admin_required
 def create_assistant():
     """Create a new assistant (admin only)"""
-    db = get_db()
-    UserProfile = get_userprofile_model()
-    user_id = get_jwt_identity()
-    
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.get_json()
     username = data.get('username')
     email = data.get('email')
@@ -490,21 +635,16 @@ def create_assistant():
     profile_data = data.get('profile', {})  # Optional: can fill profile now or later
     
     if not username or not email or not password:
-        return jsonify({'error': 'Username, email, and password are required'}), 400
-    
-    User = get_user_model()
-    # Check if username/email already exists
-    if db.session.query(User).filter_by(username=username).first():
-        return jsonify({'error': 'Username already exists'}), 400
-    if db.session.query(User).filter_by(email=email).first():
-        return jsonify({'error': 'Email already exists'}), 400
+        return json_response({'error': 'Username, email, and password are required'}, 400)
     
     try:
+        # username/email are UNIQUE: duplicates surface as IntegrityError on flush,
+        # so the happy path needs no existence pre-checks
         # Create assistant user
         assistant = User(
             username=username,
             email=email,
-            password_hash=generate_password_hash(password),
+            password_hash=hash_password(password),
             role='assistant',
             language=data.get('language', 'fa')
         )
@@ -561,9 +701,10 @@ def create_assistant():
             db.session.add(profile)
         
         db.session.commit()
+        invalidate_cached('assistants')
         
         # Return password in response (only time it's available)
-        return jsonify({
+        return json_response({
             'message': 'Assistant created successfully',
             'assistant': {
                 'id': assistant.id,
@@ -572,24 +713,27 @@ def create_assistant():
                 'password': password,  # Return password so admin can see it
                 'profile_complete': profile_data != {}
             }
-        }), 201
+        }, 201)
+    except IntegrityError:
+        db.session.rollback()
+        # Only report a duplicate when one exists; other constraints (e.g. on the profile row) are not
+        if db.session.execute(select(exists().where(User.username == username))).scalar():
+            return json_response({'error': 'Username already exists'}, 400)
+        if db.session.execute(select(exists().where(User.email == email))).scalar():
+            return json_response({'error': 'Email already exists'}, 400)
+        current_app.logger.exception("create_assistant: integrity error")
+        return json_response({'error': 'Could not create assistant'}, 500)
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 @admin_bp.route('/assistants/<int:assistant_id>', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_assistant(assistant_id):
     """Get single assistant with full profile (admin only)"""
-    db = get_db()
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    User = get_user_model()
-    UserProfile = get_userprofile_model()
     assistant = db.session.query(User).filter_by(id=assistant_id, role='assistant').first()
     if not assistant:
-        return jsonify({'error': 'Assistant not found'}), 404
+        return json_response({'error': 'Assistant not found'}, 404)
     profile = db.session.query(UserProfile).filter_by(user_id=assistant_id).first()
     out = {
         'id': assistant.id,
@@ -631,84 +775,65 @@ def get_assistant(assistant_id):
             'education': profile.education or '',
             'bio': profile.bio or ''
         }
-    return jsonify(out), 200
+    return json_response(out)
 
 @admin_bp.route('/assistants/<int:assistant_id>', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_assistant(assistant_id):
     """Update assistant account and profile (admin only)"""
-    db = get_db()
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    User = get_user_model()
-    UserProfile = get_userprofile_model()
     assistant = db.session.query(User).filter_by(id=assistant_id, role='assistant').first()
     if not assistant:
-        return jsonify({'error': 'Assistant not found'}), 404
+        return json_response({'error': 'Assistant not found'}, 404)
     data = request.get_json() or {}
     if 'username' in data and data['username']:
         existing = db.session.query(User).filter(User.username == data['username'], User.id != assistant_id).first()
         if existing:
-            return jsonify({'error': 'Username already taken'}), 400
+            return json_response({'error': 'Username already taken'}, 400)
         assistant.username = data['username']
     if 'email' in data and data['email']:
-        import re
-        if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', data['email']):
-            return jsonify({'error': 'Invalid email format'}), 400
+        if not is_valid_email(data['email']):
+            return json_response({'error': 'Invalid email format'}, 400)
         existing = db.session.query(User).filter(User.email == data['email'], User.id != assistant_id).first()
         if existing:
-            return jsonify({'error': 'Email already taken'}), 400
+            return json_response({'error': 'Email already taken'}, 400)
         assistant.email = data['email']
     if 'language' in data:
         assistant.language = data['language'] or 'fa'
     if 'password' in data and data.get('password'):
-        assistant.password_hash = generate_password_hash(data['password'])
+        assistant.password_hash = hash_password(data['password'])
     profile_data = data.get('profile', {})
     if profile_data is not None:
+        unknown = profile_data.keys() - _PROFILE_UPDATE_COLUMNS
+        if unknown:
+            return json_response({'error': f"Unknown profile fields: {', '.join(sorted(unknown))}"}, 400)
         profile = db.session.query(UserProfile).filter_by(user_id=assistant_id).first()
         if not profile:
             profile = UserProfile(user_id=assistant_id, account_type='assistant')
             db.session.add(profile)
         for key, value in profile_data.items():
-            if hasattr(profile, key):
-                if key in ['fitness_goals', 'injuries', 'medical_conditions', 'equipment_access', 'home_equipment']:
-                    if hasattr(profile, f'set_{key}'):
-                        getattr(profile, f'set_{key}')(value)
-                    else:
-                        setattr(profile, key, json.dumps(value) if isinstance(value, list) else value)
-                else:
-                    setattr(profile, key, value)
+            setattr(profile, key, value)
     try:
         db.session.commit()
-        return jsonify({'message': 'Assistant updated successfully'}), 200
+        invalidate_cached('assistants')
+        return json_response({'message': 'Assistant updated successfully'})
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 @admin_bp.route('/assistants/<int:assistant_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_assistant(assistant_id):
     """Delete an assistant (admin only)"""
-    db = get_db()
-    user_id = get_jwt_identity()
-    
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    User = get_user_model()
-    UserProfile = get_userprofile_model()
-    
     assistant = db.session.query(User).filter_by(id=assistant_id, role='assistant').first()
     if not assistant:
-        return jsonify({'error': 'Assistant not found'}), 404
+        return json_response({'error': 'Assistant not found'}, 404)
     
     # Check if assistant has assigned members
     assigned_members_count = db.session.query(User).filter_by(assigned_to=assistant_id).count()
     if assigned_members_count > 0:
-        return jsonify({
+        return json_response({
             'error': f'Cannot delete assistant with {assigned_members_count} assigned members. Please reassign members first.'
-        }), 400
+        }, 400)
     
     try:
         # Delete profile first
@@ -719,47 +844,64 @@ def delete_assistant(assistant_id):
         # Delete user
         db.session.delete(assistant)
         db.session.commit()
+        invalidate_cached('assistants', 'members')
+        # Tombstone: the deleted user's unexpired tokens stop resolving to a role
+        set_cached_role(assistant_id, '')
         
-        return jsonify({'message': 'Assistant deleted successfully'}), 200
+        return json_response({'message': 'Assistant deleted successfully'})
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 # ==================== Member Management ====================
 
 @admin_bp.route('/members', methods=['GET'])
-@jwt_required()
+@etag_response()
+@cached_response('members')
 def get_members():
     """Get all members (admin and assistants can see their assigned members)"""
-    db = get_db()
-    UserProfile = get_userprofile_model()
     user_id = get_jwt_identity()
-    User = get_user_model()
-    user = db.session.get(User, int(user_id))
+    role = get_user_role(user_id)
     
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
+    if not role:
+        return json_response({'error': 'User not found'}, 404)
     
-    if user.role == 'admin':
+    # Only the columns the list returns (skips password_hash, timestamps, ...)
+    members_query = db.session.query(User).options(
+        load_only(User.id, User.username, User.email, User.assigned_to)
+    )
+    if role == 'admin':
         # Admin sees all members
-        members = db.session.query(User).filter_by(role='member').all()
-    elif user.role == 'assistant':
+        members_query = members_query.filter_by(role='member')
+    elif role == 'assistant':
         # Assistant sees only assigned members
-        members = db.session.query(User).filter_by(role='member', assigned_to=user_id).all()
+        # Identity is a string; bind an int so the (assigned_to, role) index is usable
+        members_query = members_query.filter_by(role='member', assigned_to=int(user_id))
     else:
-        return jsonify({'error': 'Unauthorized'}), 403
+        return json_response({'error': 'Unauthorized'}, 403)
+    members, next_cursor, paged = _keyset_page(members_query, User.id)
+    
+    member_ids = [m.id for m in members]
+    profiles = {
+        p.user_id: p for p in
+        db.session.query(UserProfile).options(load_only(
+            UserProfile.user_id, UserProfile.age, UserProfile.weight, UserProfile.height,
+            UserProfile.gender, UserProfile.training_level, UserProfile.account_type,
+        )).filter(UserProfile.user_id.in_(member_ids)).all()
+    } if member_ids else {}
+    # Assignees as (id, username, role) tuples in one query, not a full User row per member
+    assignee_ids = {m.assigned_to for m in members if m.assigned_to}
+    assignees = {
+        a_id: {'id': a_id, 'username': a_username, 'role': a_role}
+        for a_id, a_username, a_role in db.session.execute(
+            select(User.id, User.username, User.role).where(User.id.in_(assignee_ids))
+        )
+    } if assignee_ids else {}
     
     members_data = []
     for member in members:
-        profile = db.session.query(UserProfile).filter_by(user_id=member.id).first()
-        assigned_to_user = None
-        if member.assigned_to:
-            assigned_to = db.session.get(User, member.assigned_to)
-            assigned_to_user = {
-                'id': assigned_to.id,
-                'username': assigned_to.username,
-                'role': assigned_to.role
-            } if assigned_to else None
+        profile = profiles.get(member.id)
+        assigned_to_user = assignees.get(member.assigned_to) if member.assigned_to else None
         
         members_data.append({
             'id': member.id,
@@ -776,30 +918,25 @@ def get_members():
             } if profile else None
         })
     
-    return jsonify(members_data), 200
+    if paged:
+        return json_response({'items': members_data, 'next_cursor': next_cursor})
+    return json_response(members_data)
 
 @admin_bp.route('/members/<int:member_id>/assign', methods=['POST'])
-@jwt_required()
+@admin_required
 def assign_member(member_id):
     """Assign a member to an assistant or admin (admin only)"""
-    db = get_db()
-    user_id = get_jwt_identity()
-    
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.get_json()
     assigned_to_id = data.get('assigned_to_id')  # Assistant or admin ID
     
-    User = get_user_model()
     member = db.session.query(User).filter_by(id=member_id, role='member').first()
     if not member:
-        return jsonify({'error': 'Member not found'}), 404
+        return json_response({'error': 'Member not found'}, 404)
     
     if assigned_to_id:
-        assigned_to = db.session.get(User, assigned_to_id)
-        if not assigned_to or assigned_to.role not in ['admin', 'assistant']:
-            return jsonify({'error': 'Invalid assistant/admin ID'}), 400
+        assigned_role = db.session.execute(select(User.role).where(User.id == assigned_to_id)).scalar()
+        if assigned_role not in ('admin', 'assistant'):
+            return json_response({'error': 'Invalid assistant/admin ID'}, 400)
         member.assigned_to = assigned_to_id
     else:
         # Unassign
@@ -807,109 +944,85 @@ def assign_member(member_id):
     
     try:
         db.session.commit()
-        return jsonify({'message': 'Member assignment updated successfully'}), 200
+        invalidate_cached('members', 'assistants')
+        return json_response({'message': 'Member assignment updated successfully'})
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 @admin_bp.route('/members/<int:member_id>/profile', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_member_profile(member_id):
     """Update member profile details (admin only)"""
-    db = get_db()
-    UserProfile = get_userprofile_model()
-    user_id = get_jwt_identity()
-    
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    User = get_user_model()
-    member = db.session.query(User).filter_by(id=member_id, role='member').first()
-    if not member:
-        return jsonify({'error': 'Member not found'}), 404
-    
-    data = request.get_json()
-    profile = db.session.query(UserProfile).filter_by(user_id=member_id).first()
+    member_exists = db.session.execute(
+        select(exists().where(User.id == member_id, User.role == 'member'))
+    ).scalar()
+    if not member_exists:
+        return json_response({'error': 'Member not found'}, 404)
     
-    if not profile:
-        # Create profile if doesn't exist
-        profile = UserProfile(user_id=member_id, account_type='member')
-        db.session.add(profile)
-    
-    # Update all profile fields
-    for key, value in data.items():
-        if hasattr(profile, key):
-            if key in ['fitness_goals', 'injuries', 'medical_conditions', 'equipment_access', 'home_equipment']:
-                # Handle JSON fields
-                if hasattr(profile, f'set_{key}'):
-                    getattr(profile, f'set_{key}')(value)
-                else:
-                    setattr(profile, key, json.dumps(value) if isinstance(value, list) else value)
-            else:
-                setattr(profile, key, value)
+    data = request.get_json() or {}
+    unknown = data.keys() - _PROFILE_UPDATE_COLUMNS
+    if unknown:
+        return json_response({'error': f"Unknown profile fields: {', '.join(sorted(unknown))}"}, 400)
+    # JSON list columns (fitness_goals, injuries, ...) take the lists as-is; JSONList encodes them
+    values = dict(data)
+    # ON CONFLICT UPDATE does not run Column.onupdate, so stamp it explicitly
+    values['updated_at'] = datetime.utcnow()
+    
+    # Create-or-update in one statement instead of SELECT then INSERT/UPDATE
+    stmt = upsert_insert(db.session, UserProfile).values({'user_id': member_id, 'account_type': 'member', **values})
+    stmt = stmt.on_conflict_do_update(index_elements=[UserProfile.user_id], set_=values)
     
     try:
+        db.session.execute(stmt)
         db.session.commit()
-        return jsonify({'message': 'Member profile updated successfully'}), 200
+        invalidate_cached('members')
+        return json_response({'message': 'Member profile updated successfully'})
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 @admin_bp.route('/members/<int:member_id>', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_member(member_id):
     """Update member account info (username, email) - admin only"""
-    db = get_db()
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    User = get_user_model()
     member = db.session.query(User).filter_by(id=member_id, role='member').first()
     if not member:
-        return jsonify({'error': 'Member not found'}), 404
+        return json_response({'error': 'Member not found'}, 404)
     data = request.get_json() or {}
     if 'username' in data and data['username']:
         existing = db.session.query(User).filter(User.username == data['username'], User.id != member_id).first()
         if existing:
-            return jsonify({'error': 'Username already taken'}), 400
+            return json_response({'error': 'Username already taken'}, 400)
         member.username = data['username']
     if 'email' in data and data['email']:
-        import re
-        if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', data['email']):
-            return jsonify({'error': 'Invalid email format'}), 400
+        if not is_valid_email(data['email']):
+            return json_response({'error': 'Invalid email format'}, 400)
         existing = db.session.query(User).filter(User.email == data['email'], User.id != member_id).first()
         if existing:
-            return jsonify({'error': 'Email already taken'}), 400
+            return json_response({'error': 'Email already taken'}, 400)
         member.email = data['email']
     if 'language' in data:
         member.language = data['language'] or 'fa'
     try:
         db.session.commit()
-        return jsonify({
+        invalidate_cached('members')
+        return json_response({
             'message': 'Member updated successfully',
             'username': member.username,
             'email': member.email
-        }), 200
+        })
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 @admin_bp.route('/members/<int:member_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_member(member_id):
     """Delete a member (admin only)"""
-    db = get_db()
-    user_id = get_jwt_identity()
-    
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    User = get_user_model()
-    UserProfile = get_userprofile_model()
-    
     member = db.session.query(User).filter_by(id=member_id, role='member').first()
     if not member:
-        return jsonify({'error': 'Member not found'}), 404
+        return json_response({'error': 'Member not found'}, 404)
     
     try:
         # Delete profile first
@@ -920,41 +1033,43 @@ def delete_member(member_id):
         # Delete user
         db.session.delete(member)
         db.session.commit()
+        invalidate_cached('members', 'assistants')
+        # Tombstone: the deleted user's unexpired tokens stop resolving to a role
+        set_cached_role(member_id, '')
         
-        return jsonify({'message': 'Member deleted successfully'}), 200
+        return json_response({'message': 'Member deleted successfully'})
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 @admin_bp.route('/members/<int:member_id>', methods=['GET'])
-@jwt_required()
+@etag_response()
 def get_member_details(member_id):
     """Get detailed member information (admin and assistants can see their assigned members)"""
-    db = get_db()
-    UserProfile = get_userprofile_model()
     user_id = get_jwt_identity()
-    User = get_user_model()
-    user = db.session.get(User, int(user_id))
+    role = get_user_role(user_id)
     
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
+    if not role:
+        return json_response({'error': 'User not found'}, 404)
     
-    member = db.session.query(User).filter_by(id=member_id, role='member').first()
-    if not member:
-        return jsonify({'error': 'Member not found'}), 404
+    # Member and profile in one round trip
+    row = db.session.query(User, UserProfile).outerjoin(
+        UserProfile, UserProfile.user_id == User.id
+    ).filter(User.id == member_id, User.role == 'member').first()
+    if not row:
+        return json_response({'error': 'Member not found'}, 404)
+    member, profile = row
     
     # Check if user has permission to view this member
-    if user.role == 'admin':
+    if role == 'admin':
         # Admin can see all members
         pass
-    elif user.role == 'assistant':
-        # Assistant can only see assigned members
-        if member.assigned_to != user_id:
-            return jsonify({'error': 'Unauthorized'}), 403
+    elif role == 'assistant':
+        # Assistant can only see assigned members (JWT identity is a string)
+        if member.assigned_to != int(user_id):
+            return json_response({'error': 'Unauthorized'}, 403)
     else:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    profile = db.session.query(UserProfile).filter_by(user_id=member_id).first()
+        return json_response({'error': 'Unauthorized'}, 403)
     
     member_data = {
         'id': member.id,
@@ -993,22 +1108,17 @@ def get_member_details(member_id):
             'preferred_intensity': profile.preferred_intensity
         }
     
-    return jsonify(member_data), 200
+    return json_response(member_data)
 
 # ==================== Configuration Management ====================
 
 @admin_bp.route('/config', methods=['GET'])
-@jwt_required()
+@admin_required
+@etag_response()
+@cached_response('config', ttl=60)
 def get_configuration():
     """Get training levels and injuries configuration (admin only)"""
-    db = get_db()
-    user_id = get_jwt_identity()
-    
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     # Try to get from database, if not exists return defaults
-    from models import Configuration
     config = db.session.query(Configuration).first()
     
     def _default_purposes():
@@ -1029,7 +1139,7 @@ def get_configuration():
     }
 
     if config:
-        raw_levels = json.loads(config.training_levels) if config.training_levels else {}
+        raw_levels = json_loads(config.training_levels) if config.training_levels else {}
         training_levels_out = {}
         for level_key in ('beginner', 'intermediate', 'advanced'):
             stored = raw_levels.get(level_key) or {}
@@ -1044,7 +1154,7 @@ def get_configuration():
                 stored_p = (stored.get('purposes') or {}).get(purpose_key) or {}
                 merged['purposes'][purpose_key] = {**default_purpose, **stored_p}
             training_levels_out[level_key] = merged
-        raw_injuries = json.loads(config.injuries) if config.injuries else {}
+        raw_injuries = json_loads(config.injuries) if config.injuries else {}
         injury_keys = ['knee', 'shoulder', 'lower_back', 'neck', 'wrist', 'ankle']
         injuries_out = {}
         for key in injury_keys:
@@ -1060,10 +1170,10 @@ def get_configuration():
             injuries_out[key] = merged
         injuries_out['common_injury_note_fa'] = raw_injuries.get('common_injury_note_fa', '')
         injuries_out['common_injury_note_en'] = raw_injuries.get('common_injury_note_en', '')
-        return jsonify({
+        return json_response({
             'training_levels': training_levels_out,
             'injuries': injuries_out
-        }), 200
+        })
     else:
         _default_injury = lambda: {
             'purposes_fa': '', 'purposes_en': '', 'allowed_movements': [], 'forbidden_movements': [],
@@ -1072,67 +1182,59 @@ def get_configuration():
         default_injuries = {k: _default_injury() for k in ['knee', 'shoulder', 'lower_back', 'neck', 'wrist', 'ankle']}
         default_injuries['common_injury_note_fa'] = ''
         default_injuries['common_injury_note_en'] = ''
-        return jsonify({
+        return json_response({
             'training_levels': default_training_levels,
             'injuries': default_injuries
-        }), 200
+        })
 
 @admin_bp.route('/config', methods=['POST'])
-@jwt_required()
+@admin_required
 def save_configuration():
     """Save training levels and injuries configuration (admin only)"""
-    db = get_db()
-    user_id = get_jwt_identity()
-    
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.get_json()
     training_levels = data.get('training_levels', {})
     injuries = data.get('injuries', {})
     
-    from models import Configuration
     config = db.session.query(Configuration).first()
     
     if not config:
         config = Configuration()
         db.session.add(config)
     
-    config.training_levels = json.dumps(training_levels, ensure_ascii=False)
-    config.injuries = json.dumps(injuries, ensure_ascii=False)
+    config.training_levels = dumps_text(training_levels)
+    config.injuries = dumps_text(injuries)
     
     try:
         db.session.commit()
+        invalidate_cached('config')
         try:
             from services.website_kb import trigger_kb_reindex_async
             trigger_kb_reindex_async()
         except Exception:
             pass
-        return jsonify({'message': 'Configuration saved successfully'}), 200
+        return json_response({'message': 'Configuration saved successfully'})
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 @admin_bp.route('/check-profile-complete', methods=['GET'])
 @jwt_required()
+@etag_response()
 def check_profile_complete():
     """Check if current user (assistant) has completed their profile"""
-    db = get_db()
-    UserProfile = get_userprofile_model()
     user_id = get_jwt_identity()
     
-    User = get_user_model()
-    user = db.session.get(User, int(user_id))
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
+    role = get_user_role(user_id)
+    if not role:
+        return json_response({'error': 'User not found'}, 404)
     
-    if user.role != 'assistant':
-        return jsonify({'profile_complete': True, 'message': 'Not an assistant'}), 200
+    if role != 'assistant':
+        return json_response({'profile_complete': True, 'message': 'Not an assistant'})
     
     profile = db.session.query(UserProfile).filter_by(user_id=user_id).first()
     
     if not profile or profile.account_type != 'assistant':
-        return jsonify({'profile_complete': False, 'message': 'Profile not complete'}), 200
+        return json_response({'profile_complete': False, 'message': 'Profile not complete'})
     
     # Check if essential fields are filled
     profile_complete = bool(
@@ -1143,35 +1245,33 @@ def check_profile_complete():
         profile.training_level
     )
     
-    return jsonify({
+    return json_response({
         'profile_complete': profile_complete,
         'message': 'Profile complete' if profile_complete else 'Profile incomplete'
-    }), 200
+    })
 
 
 # ==================== Break Requests (admin/assistant) ====================
 
 @admin_bp.route('/break-requests', methods=['GET'])
-@jwt_required()
 def list_break_requests():
     """List break requests: admin sees all, assistant sees only from their assigned members."""
-    db = get_db()
-    User = get_user_model()
     user_id = get_jwt_identity()
     user_id_int = int(user_id) if isinstance(user_id, str) else user_id
-    user = db.session.get(User, user_id_int)
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-    if user.role not in ('admin', 'assistant'):
-        return jsonify({'error': 'Unauthorized'}), 403
-
-    from models import BreakRequest
-    if user.role == 'admin':
+    role = get_user_role(user_id)
+    if not role:
+        return json_response({'error': 'User not found'}, 404)
+    if role not in ('admin', 'assistant'):
+        return json_response({'error': 'Unauthorized'}, 403)
+
+    if role == 'admin':
         query = db.session.query(BreakRequest).order_by(BreakRequest.created_at.desc())
     else:
-        member_ids = [m.id for m in db.session.query(User).filter_by(role='member', assigned_to=user_id_int).all()]
+        member_ids = db.session.scalars(
+            select(User.id).where(User.assigned_to == user_id_int, User.role == 'member')
+        ).all()
         if not member_ids:
-            return jsonify([]), 200
+            return json_response([])
         query = db.session.query(BreakRequest).filter(
             BreakRequest.user_id.in_(member_ids)
         ).order_by(BreakRequest.created_at.desc())
@@ -1181,13 +1281,13 @@ def list_break_requests():
         query = query.filter_by(status=status_filter)
 
     requests_list = query.limit(100).all()
+    usernames = _usernames_by_id({br.user_id for br in requests_list})
     out = []
     for br in requests_list:
-        member = db.session.get(User, br.user_id)
         out.append({
             'id': br.id,
             'user_id': br.user_id,
-            'username': member.username if member else None,
+            'username': usernames.get(br.user_id),
             'message': br.message,
             'status': br.status,
             'created_at': br.created_at.isoformat() if br.created_at else None,
@@ -1195,72 +1295,70 @@ def list_break_requests():
             'responded_at': br.responded_at.isoformat() if br.responded_at else None,
             'response_message': br.response_message,
         })
-    return jsonify(out), 200
+    return json_response(out)
 
 
 @admin_bp.route('/break-requests/<int:request_id>/seen', methods=['PATCH'])
-@jwt_required()
 def mark_break_request_seen(request_id):
     """Mark a break request as seen (admin or assistant who can see it)."""
-    db = get_db()
-    User = get_user_model()
     user_id = get_jwt_identity()
     user_id_int = int(user_id) if isinstance(user_id, str) else user_id
-    user = db.session.get(User, user_id_int)
-    if not user or user.role not in ('admin', 'assistant'):
-        return jsonify({'error': 'Unauthorized'}), 403
+    role = get_user_role(user_id)
+    if role not in ('admin', 'assistant'):
+        return json_response({'error': 'Unauthorized'}, 403)
 
-    from models import BreakRequest
     br = db.session.query(BreakRequest).filter_by(id=request_id).first()
     if not br:
-        return jsonify({'error': 'Break request not found'}), 404
-    if user.role == 'assistant':
-        member = db.session.get(User, br.user_id)
-        if not member or member.assigned_to != user_id_int:
-            return jsonify({'error': 'Unauthorized'}), 403
+        return json_response({'error': 'Break request not found'}, 404)
+    if role == 'assistant':
+        # Only the assignee column is needed for the ownership check
+        member_assigned_to = db.session.execute(
+            select(User.assigned_to).where(User.id == br.user_id)
+        ).scalar()
+        if member_assigned_to != user_id_int:
+            return json_response({'error': 'Unauthorized'}, 403)
 
     from datetime import datetime
     br.status = 'seen'
     br.seen_at = datetime.utcnow()
     try:
         db.session.commit()
-        return jsonify({
+        return json_response({
             'id': br.id,
             'status': br.status,
             'seen_at': br.seen_at.isoformat() if br.seen_at else None,
-        }), 200
+        })
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @admin_bp.route('/break-requests/<int:request_id>/respond', methods=['PATCH'])
-@jwt_required()
 def respond_break_request(request_id):
     """Accept or deny a break request (admin or assistant who can see it)."""
-    db = get_db()
-    User = get_user_model()
     user_id = get_jwt_identity()
     user_id_int = int(user_id) if isinstance(user_id, str) else user_id
-    user = db.session.get(User, user_id_int)
-    if not user or user.role not in ('admin', 'assistant'):
-        return jsonify({'error': 'Unauthorized'}), 403
+    role = get_user_role(user_id)
+    if role not in ('admin', 'assistant'):
+        return json_response({'error': 'Unauthorized'}, 403)
 
-    from models import BreakRequest
     from datetime import datetime
 
     br = db.session.query(BreakRequest).filter_by(id=request_id).first()
     if not br:
-        return jsonify({'error': 'Break request not found'}), 404
-    if user.role == 'assistant':
-        member = db.session.get(User, br.user_id)
-        if not member or member.assigned_to != user_id_int:
-            return jsonify({'error': 'Unauthorized'}), 403
+        return json_response({'error': 'Break request not found'}, 404)
+    if role == 'assistant':
+        # Only the assignee column is needed for the ownership check
+        member_assigned_to = db.session.execute(
+            select(User.assigned_to).where(User.id == br.user_id)
+        ).scalar()
+        if member_assigned_to != user_id_int:
+            return json_response({'error': 'Unauthorized'}, 403)
 
     data = request.get_json() or {}
     action = (data.get('action') or '').strip().lower()
     if action not in ('accept', 'deny'):
-        return jsonify({'error': 'action must be "accept" or "deny"'}), 400
+        return json_response({'error': 'action must be "accept" or "deny"'}, 400)
 
     response_message = (data.get('message') or data.get('response_message') or '').strip() or None
 
@@ -1272,37 +1370,32 @@ def respond_break_request(request_id):
 
     try:
         db.session.commit()
-        return jsonify({
+        return json_response({
             'id': br.id,
             'status': br.status,
             'responded_at': br.responded_at.isoformat() if br.responded_at else None,
             'response_message': br.response_message,
-        }), 200
+        })
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 # ==================== Site Settings (website info) ====================
 
 @admin_bp.route('/site-settings', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_site_settings():
     """Get site settings (admin only)."""
-    db = get_db()
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    from models import SiteSettings
     row = db.session.query(SiteSettings).first()
     if not row:
-        return jsonify({
+        return json_response({
             'contact_email': '', 'contact_phone': '', 'address_fa': '', 'address_en': '',
             'app_description_fa': '', 'app_description_en': '',
             'instagram_url': '', 'telegram_url': '', 'whatsapp_url': '', 'twitter_url': '',
             'facebook_url': '', 'linkedin_url': '', 'youtube_url': '', 'copyright_text': '',
             'session_phases_json': '', 'training_plans_products_json': ''
-        }), 200
+        })
     out = {
         'contact_email': row.contact_email or '',
         'contact_phone': row.contact_phone or '',
@@ -1315,19 +1408,14 @@ def get_site_settings():
         'session_phases_json': row.session_phases_json if hasattr(row, 'session_phases_json') and row.session_phases_json else '',
         'training_plans_products_json': row.training_plans_products_json if hasattr(row, 'training_plans_products_json') and row.training_plans_products_json else '',
     }
-    return jsonify(out), 200
+    return json_response(out)
 
 
 @admin_bp.route('/site-settings', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_site_settings():
     """Update site settings (admin only)."""
-    db = get_db()
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
     data = request.get_json() or {}
-    from models import SiteSettings
     row = db.session.query(SiteSettings).first()
     if not row:
         row = SiteSettings()
@@ -1347,119 +1435,85 @@ def update_site_settings():
             elif isinstance(val, str):
                 setattr(row, key, val.strip() or None)
             elif isinstance(val, (dict, list)):
-                setattr(row, key, json.dumps(val, ensure_ascii=False))
+                setattr(row, key, dumps_text(val))
             else:
                 setattr(row, key, str(val))
     try:
         db.session.commit()
+        invalidate_cached('session_phases')
         try:
             from services.website_kb import trigger_kb_reindex_async
             trigger_kb_reindex_async()
         except Exception:
             pass
-        return jsonify({'message': 'Site settings saved successfully'}), 200
+        return json_response({'message': 'Site settings saved successfully'})
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 
 # ---------- Session phases (warming, cooldown, ending) for member session steps ----------
 @admin_bp.route('/session-phases', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_session_phases():
     """Get warming, cooldown, ending message (admin)."""
-    db = get_db()
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    from models import SiteSettings
-    row = db.session.query(SiteSettings).first()
-    raw = (getattr(row, 'session_phases_json', None) or '').strip() if row else ''
-    if not raw:
-        return jsonify({
-            'warming': {'title_fa': '', 'title_en': '', 'steps': []},
-            'cooldown': {'title_fa': '', 'title_en': '', 'steps': []},
-            'ending_message_fa': '',
-            'ending_message_en': ''
-        }), 200
-    try:
-        return jsonify(json.loads(raw)), 200
-    except Exception:
-        return jsonify({
-            'warming': {'title_fa': '', 'title_en': '', 'steps': []},
-            'cooldown': {'title_fa': '', 'title_en': '', 'steps': []},
-            'ending_message_fa': '',
-            'ending_message_en': ''
-        }), 200
+    data = load_session_phases(db)
+    return json_response(data if data is not None else EMPTY_SESSION_PHASES)
 
 
 @admin_bp.route('/session-phases', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_session_phases():
     """Update warming, cooldown, ending message (admin)."""
-    db = get_db()
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
     data = request.get_json()
     if not isinstance(data, dict):
-        return jsonify({'error': 'Invalid body'}), 400
-    from models import SiteSettings
+        return json_response({'error': 'Invalid body'}, 400)
     row = db.session.query(SiteSettings).first()
     if not row:
         row = SiteSettings()
         db.session.add(row)
-    row.session_phases_json = json.dumps(data, ensure_ascii=False)
+    row.session_phases_json = dumps_text(data)
     try:
         db.session.commit()
+        invalidate_cached('session_phases')
         try:
             from services.website_kb import trigger_kb_reindex_async
             trigger_kb_reindex_async()
         except Exception:
             pass
-        return jsonify({'message': 'Session phases saved'}), 200
+        return json_response({'message': 'Session phases saved'})
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 
 # ---------- Training plans & packages (buy modal content) ----------
 @admin_bp.route('/training-plans-products', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_training_plans_products():
     """Get buyable training plans and packages config (admin)."""
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    db = get_db()
-    from models import SiteSettings
     row = db.session.query(SiteSettings).first()
     raw = (getattr(row, 'training_plans_products_json', None) or '').strip() if row else ''
     if not raw:
-        return jsonify({'basePrograms': [], 'packages': []}), 200
+        return json_response({'basePrograms': [], 'packages': []})
     try:
-        return jsonify(json.loads(raw)), 200
+        return json_response(json_loads(raw))
     except Exception:
-        return jsonify({'basePrograms': [], 'packages': []}), 200
+        return json_response({'basePrograms': [], 'packages': []})
 
 
 @admin_bp.route('/training-plans-products', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_training_plans_products():
     """Update buyable training plans and packages (admin)."""
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
     data = request.get_json()
     if not isinstance(data, dict):
-        return jsonify({'error': 'Invalid body'}), 400
-    db = get_db()
-    from models import SiteSettings
+        return json_response({'error': 'Invalid body'}, 400)
     row = db.session.query(SiteSettings).first()
     if not row:
         row = SiteSettings()
         db.session.add(row)
-    row.training_plans_products_json = json.dumps(data, ensure_ascii=False)
+    row.training_plans_products_json = dumps_text(data)
     try:
         db.session.commit()
         try:
@@ -1467,20 +1521,17 @@ def update_training_plans_products():
             trigger_kb_reindex_safe()
         except Exception:
             pass
-        return jsonify({'message': 'Training plans & packages saved'}), 200
+        return json_response({'message': 'Training plans & packages saved'})
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 
 # ---------- AI Settings (provider keys + selected provider) ----------
 @admin_bp.route('/ai-settings', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_ai_settings():
     """Get AI provider settings (no API keys in response). Admin only."""
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
     try:
         from services.ai_provider import _get_settings, get_provider_api_key, is_sdk_installed, PROVIDERS, SELECTED_DEFAULT
         settings = _get_settings()
@@ -1496,24 +1547,21 @@ def get_ai_settings():
                 'is_valid': prov_data.get('is_valid', False),
                 'last_tested_at': prov_data.get('last_tested_at'),
             }
-        return jsonify({
+        return json_response({
             'selected_provider': selected,
             'providers': providers,
-        }), 200
+        })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @admin_bp.route('/ai-settings', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_ai_settings():
     """Update AI settings: selected_provider and/or API keys per provider. Admin only."""
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
     data = request.get_json()
     if not isinstance(data, dict):
-        return jsonify({'error': 'Invalid body'}), 400
+        return json_response({'error': 'Invalid body'}, 400)
     try:
         from services.ai_provider import _get_settings, _save_settings, PROVIDERS, SELECTED_DEFAULT
         settings = _get_settings()
@@ -1530,113 +1578,95 @@ def update_ai_settings():
                 else:
                     settings[p]['api_key'] = key.strip() if isinstance(key, str) else str(key)
         if not _save_settings(settings):
-            return jsonify({'error': 'Failed to save settings'}), 500
-        return jsonify({'message': 'AI settings saved'}), 200
+            return json_response({'error': 'Failed to save settings'}, 500)
+        return json_response({'message': 'AI settings saved'})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 # ---------- Website KB ----------
 @admin_bp.route('/website-kb/status', methods=['GET'])
-@jwt_required()
+@admin_required
 def kb_status():
-    if not is_admin(get_jwt_identity()):
-        return jsonify({'error': 'Unauthorized'}), 403
     from services.website_kb import get_kb_status
     status = get_kb_status()
-    return jsonify({
+    return json_response({
         'updated_at': status.get('updated_at'),
         'count': status.get('count', 0),
-    }), 200
+    })
 
 
 @admin_bp.route('/website-kb/reindex', methods=['POST'])
-@jwt_required()
+@admin_required
 def kb_reindex():
-    if not is_admin(get_jwt_identity()):
-        return jsonify({'error': 'Unauthorized'}), 403
     from services.website_kb import build_kb_index
     try:
         payload = build_kb_index()
-        return jsonify({
+        return json_response({
             'message': 'KB reindexed',
             'count': payload.get('count', 0),
             'updated_at': payload.get('updated_at'),
-        }), 200
+        })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @admin_bp.route('/ai-settings/test', methods=['POST'])
-@jwt_required()
+@admin_required
 def test_ai_provider():
     """Test an AI provider's API key. Body: { provider: 'openai'|'anthropic'|'gemini', api_key?: optional }. Admin only."""
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
     data = request.get_json() or {}
     provider = (data.get('provider') or '').strip().lower()
     if provider not in ('openai', 'anthropic', 'gemini', 'vertex'):
-        return jsonify({'error': 'Invalid provider'}), 400
+        return json_response({'error': 'Invalid provider'}, 400)
     api_key_override = data.get('api_key')
     if api_key_override is not None and isinstance(api_key_override, str):
         api_key_override = api_key_override.strip() or None
     try:
         from services.ai_provider import test_provider
         success, message = test_provider(provider, api_key_override)
-        return jsonify({'success': success, 'message': message}), 200
+        return json_response({'success': success, 'message': message})
     except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 200
+        return json_response({'success': False, 'message': str(e)})
 
 
 # ---------- Progress check requests (trainer accept/deny) ----------
 @admin_bp.route('/progress-check-requests', methods=['GET'])
-@jwt_required()
 def list_progress_check_requests():
     """List pending progress check requests (admin/assistant)."""
-    db = get_db()
-    user_id = get_jwt_identity()
-    if not is_admin_or_assistant(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    from models import ProgressCheckRequest, User
     status_filter = request.args.get('status', 'pending')
     q = db.session.query(ProgressCheckRequest)
     if status_filter:
         q = q.filter_by(status=status_filter)
     q = q.order_by(ProgressCheckRequest.requested_at.desc()).limit(50)
     rows = q.all()
+    usernames = _usernames_by_id({r.member_id for r in rows})
     out = []
     for r in rows:
-        member = db.session.get(User, r.member_id)
         out.append({
             'id': r.id,
             'member_id': r.member_id,
-            'member_username': member.username if member else None,
+            'member_username': usernames.get(r.member_id),
             'status': r.status,
             'requested_at': r.requested_at.isoformat() if r.requested_at else None,
             'responded_at': r.responded_at.isoformat() if r.responded_at else None,
         })
-    return jsonify(out), 200
+    return json_response(out)
 
 
 @admin_bp.route('/progress-check-requests/<int:req_id>', methods=['PATCH'])
-@jwt_required()
 def respond_progress_check_request(req_id):
     """Accept or deny a progress check request (admin/assistant)."""
-    db = get_db()
     user_id = get_jwt_identity()
-    if not is_admin_or_assistant(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    from models import ProgressCheckRequest, Notification
     data = request.get_json() or {}
     action = (data.get('action') or '').strip().lower()
     if action not in ('accept', 'deny'):
-        return jsonify({'error': 'action must be accept or deny'}), 400
+        return json_response({'error': 'action must be accept or deny'}, 400)
     req = db.session.query(ProgressCheckRequest).filter_by(id=req_id).first()
     if not req:
-        return jsonify({'error': 'Request not found'}), 404
+        return json_response({'error': 'Request not found'}, 404)
     if req.status != 'pending':
-        return jsonify({'error': 'Request already responded'}), 400
+        return json_response({'error': 'Request already responded'}, 400)
     from datetime import datetime
     req.status = 'accepted' if action == 'accept' else 'denied'
     req.responded_at = datetime.utcnow()
@@ -1663,43 +1693,30 @@ def respond_progress_check_request(req_id):
         db.session.add(notif)
     try:
         db.session.commit()
-        return jsonify({'id': req.id, 'status': req.status, 'message': 'Updated'}), 200
+        return json_response({'id': req.id, 'status': req.status, 'message': 'Updated'})
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 400
+        return json_response({'error': str(e)}, 400)
 
 
 # ---------- Admin list all training programs ----------
 @admin_bp.route('/programs', methods=['GET'])
-@jwt_required()
 def list_programs():
     """List all training programs for admin/assistant (to manage action notes)."""
-    db = get_db()
-    user_id = get_jwt_identity()
-    if not is_admin_or_assistant(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    from models import TrainingProgram
     language = request.args.get('language', 'fa')
     programs = db.session.query(TrainingProgram).order_by(TrainingProgram.id).all()
     out = [p.to_dict(language) for p in programs]
-    return jsonify(out), 200
+    return json_response(out)
 
 
 # ---------- Admin cleanup: keep single training program ----------
 @admin_bp.route('/training-programs/cleanup', methods=['POST'])
-@jwt_required()
+@admin_required
 def cleanup_training_programs():
     """Keep one general program and one program per member. Body: { dry_run?: bool }."""
-    db = get_db()
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-
     data = request.get_json() or {}
     dry_run = bool(data.get('dry_run', False))
 
-    from app import User
-    from models import TrainingProgram, MemberWeeklyGoal, MemberTrainingActionCompletion, TrainingActionNote
 
     # General programs: keep the first by id
     general = (
@@ -1709,18 +1726,16 @@ def cleanup_training_programs():
         .all()
     )
     if not general:
-        return jsonify({'error': 'No general training programs found'}), 400
+        return json_response({'error': 'No general training programs found'}, 400)
 
     keep_general = general[0]
     extra_general = general[1:]
     removed_general = len(extra_general)
 
     if not dry_run and extra_general:
+        # Goals, completions and notes go with the programs (ON DELETE CASCADE; explicit on SQLite)
+        delete_program_dependents(db.session, [prog.id for prog in extra_general])
         for prog in extra_general:
-            pid = prog.id
-            db.session.query(MemberWeeklyGoal).filter_by(training_program_id=pid).delete()
-            db.session.query(MemberTrainingActionCompletion).filter_by(training_program_id=pid).delete()
-            db.session.query(TrainingActionNote).filter_by(training_program_id=pid).delete()
             db.session.delete(prog)
 
     # Member programs: keep first per member, assign if none
@@ -1735,14 +1750,12 @@ def cleanup_training_programs():
             .all()
         )
         if programs:
-            for prog in programs[1:]:
-                pid = prog.id
-                if not dry_run:
-                    db.session.query(MemberWeeklyGoal).filter_by(training_program_id=pid).delete()
-                    db.session.query(MemberTrainingActionCompletion).filter_by(training_program_id=pid).delete()
-                    db.session.query(TrainingActionNote).filter_by(training_program_id=pid).delete()
+            extra = programs[1:]
+            if not dry_run and extra:
+                delete_program_dependents(db.session, [prog.id for prog in extra])
+                for prog in extra:
                     db.session.delete(prog)
-                removed_member_programs += 1
+            removed_member_programs += len(extra)
             continue
 
         # No program: copy the single general program
@@ -1764,28 +1777,22 @@ def cleanup_training_programs():
     if not dry_run:
         db.session.commit()
 
-    return jsonify({
+    return json_response({
         'dry_run': dry_run,
         'kept_general_program_id': keep_general.id,
         'removed_general_programs': removed_general,
         'removed_member_programs': removed_member_programs,
         'assigned_to_members': assigned,
-    }), 200
+    })
 
 
 # ---------- Training action notes (admin: notes/voice per exercise) ----------
 @admin_bp.route('/programs/<int:program_id>/action-notes', methods=['GET'])
-@jwt_required()
 def get_action_notes(program_id):
     """Get all trainer notes for a program (admin/assistant)."""
-    db = get_db()
-    user_id = get_jwt_identity()
-    if not is_admin_or_assistant(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    from models import TrainingProgram, TrainingActionNote
     program = db.session.get(TrainingProgram, program_id)
     if not program:
-        return jsonify({'error': 'Program not found'}), 404
+        return json_response({'error': 'Program not found'}, 404)
     rows = db.session.query(TrainingActionNote).filter_by(training_program_id=program_id).all()
     language = request.args.get('language', 'fa')
     out = []
@@ -1798,23 +1805,17 @@ def get_action_notes(program_id):
             'note': r.note_fa if language == 'fa' else r.note_en,
             'voice_url': r.voice_url or '',
         })
-    return jsonify(out), 200
+    return json_response(out)
 
 
 @admin_bp.route('/programs/<int:program_id>/action-notes', methods=['PUT'])
-@jwt_required()
 def update_action_notes(program_id):
     """Bulk update trainer notes for a program. Body: { notes: [{ session_index, exercise_index, note_fa?, note_en?, voice_url? }], notify_members?: bool }."""
-    db = get_db()
     user_id = get_jwt_identity()
-    if not is_admin_or_assistant(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-    from models import TrainingProgram, TrainingActionNote, Notification, MemberWeeklyGoal
-    from app import User
     from datetime import datetime
     program = db.session.get(TrainingProgram, program_id)
     if not program:
-        return jsonify({'error': 'Program not found'}), 404
+        return json_response({'error': 'Program not found'}, 404)
     data = request.get_json() or {}
     notes_list = data.get('notes') or []
     notify_members = data.get('notify_members', False)
@@ -1847,8 +1848,8 @@ def update_action_notes(program_id):
     db.session.commit()
     if notify_members:
         member_ids = set()
-        for g in db.session.query(MemberWeeklyGoal).filter_by(training_program_id=program_id).all():
-            member_ids.add(g.user_id)
+        for goal in db.session.query(MemberWeeklyGoal).filter_by(training_program_id=program_id).all():
+            member_ids.add(goal.user_id)
         if program.user_id:
             member_ids.add(program.user_id)
         title_fa = 'یادداشت جدید از مربی'
@@ -1867,35 +1868,31 @@ def update_action_notes(program_id):
             )
             db.session.add(n)
         db.session.commit()
-    return jsonify({'message': 'Action notes saved', 'notify_members': notify_members}), 200
+    return json_response({'message': 'Action notes saved', 'notify_members': notify_members})
 
 
 @admin_bp.route('/action-notes/voice-upload', methods=['POST'])
-@jwt_required()
 def upload_voice_note():
     """Upload a voice note file; returns { voice_url: ... } for use in action notes."""
-    db = get_db()
     user_id = get_jwt_identity()
-    if not is_admin_or_assistant(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
     from werkzeug.utils import secure_filename
     import os
     from datetime import datetime
     if 'file' not in request.files:
-        return jsonify({'error': 'No file provided'}), 400
+        return json_response({'error': 'No file provided'}, 400)
     file = request.files['file']
     if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
+        return json_response({'error': 'No file selected'}, 400)
     ext = (file.filename.rsplit('.', 1)[-1].lower() if '.' in file.filename else '') or 'webm'
     if ext not in ('webm', 'mp3', 'ogg', 'wav', 'm4a'):
-        return jsonify({'error': 'Invalid file type. Allowed: webm, mp3, ogg, wav, m4a'}), 400
+        return json_response({'error': 'Invalid file type. Allowed: webm, mp3, ogg, wav, m4a'}, 400)
     upload_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads', 'voice_notes')
     os.makedirs(upload_dir, exist_ok=True)
     filename = secure_filename(f"voice_{user_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{ext}")
     filepath = os.path.join(upload_dir, filename)
     file.save(filepath)
     voice_url = f'/api/uploads/voice_notes/{filename}'
-    return jsonify({'voice_url': voice_url, 'filename': filename}), 200
+    return json_response({'voice_url': voice_url, 'filename': filename})
 
 
 
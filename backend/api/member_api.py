@@ -2,10 +2,33 @@
 Member API: weekly goals, step counter, break requests (member-only features)
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, current_app, g
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, date, timedelta
 import json
+import re
+import traceback
+from functools import lru_cache
+from itertools import chain
+from operator import attrgetter
+from sqlalchemy import exists, func, insert, literal, or_, select, text, update
+from sqlalchemy.orm import aliased, load_only
+from services.upsert import upsert_insert
+from services.role_cache import lookup_role
+from services.training_programs import delete_program_dependents
+from services.response_cache import cached_response
+from services.json_response import json_response, static_json_response, stream_json_array
+from services.session_phases import EMPTY_SESSION_PHASES, load_session_phases
+from services.session_ai_service import (
+    _inject_session_phases,
+    adapt_session_by_mood,
+    generate_personalized_program_after_purchase,
+    generate_sessions_for_position,
+    get_post_set_feedback,
+    get_session_end_encouragement,
+)
+from services.ai_debug_logger import append_ai_program_log, append_log
+from app import User
 from models import (
     MemberWeeklyGoal,
     DailySteps,
@@ -17,14 +40,49 @@ from models import (
     Exercise,
     ProgressCheckRequest,
     PurchaseOrder,
+    UserProfile,
 )
 
 member_bp = Blueprint('member', __name__, url_prefix='/api/member')
 
+# Constant replies, encoded once at import
+_INVALID_TOKEN = static_json_response({'error': 'Invalid token'}, 401)
+_STEPS_REQUIRED = static_json_response({'error': 'steps is required'}, 400)
+_STEPS_INVALID = static_json_response({'error': 'steps must be a non-negative integer'}, 400)
+_DATE_INVALID = static_json_response({'error': 'Invalid date format (use YYYY-MM-DD)'}, 400)
+_GOAL_NOT_FOUND = static_json_response({'error': 'Goal not found'}, 404)
+_NOTIFICATION_NOT_FOUND = static_json_response({'error': 'Notification not found'}, 404)
+_MESSAGE_REQUIRED = static_json_response({'error': 'message is required'}, 400)
+_MEMBERS_ONLY_BREAK = static_json_response({'error': 'Only members can submit break requests'}, 403)
+_OK = static_json_response({'message': 'ok'})
+
+# Rows fetched per round trip when a listing is serialized straight from the cursor
+LIST_BATCH_SIZE = 500
+
+# Default weekly goal titles; the first year is built once at import (index = week - 1)
+_WEEK_TITLE_FA = 'هفته {0}: انجام جلسات هفته {0}'
+_WEEK_TITLE_EN = 'Week {0}: Complete Week {0} sessions'
+_WEEK_TITLES_FA = tuple(_WEEK_TITLE_FA.format(w) for w in range(1, 53))
+_WEEK_TITLES_EN = tuple(_WEEK_TITLE_EN.format(w) for w in range(1, 53))
+
+
+def _week_titles(weeks):
+    """(fa, en) title tuples covering weeks 1..weeks."""
+    if weeks <= len(_WEEK_TITLES_FA):
+        return _WEEK_TITLES_FA, _WEEK_TITLES_EN
+    extra = range(len(_WEEK_TITLES_FA) + 1, weeks + 1)
+    return (
+        _WEEK_TITLES_FA + tuple(_WEEK_TITLE_FA.format(w) for w in extra),
+        _WEEK_TITLES_EN + tuple(_WEEK_TITLE_EN.format(w) for w in extra),
+    )
+
 
-def _get_db():
-    """Get database instance from current app context (avoids SQLAlchemy instance mismatch)."""
-    return current_app.extensions.get('sqlalchemy')
+@member_bp.before_request
+def _attach_db():
+    """Bind the app's SQLAlchemy instance to g.db once per request (avoids SQLAlchemy instance mismatch).
+    Write handlers roll back through g.db.session on error, the same scoped session they wrote with;
+    read-only handlers never roll back (teardown closes their implicit transaction)."""
+    g.db = current_app.extensions.get('sqlalchemy')
 
 
 def _get_user_id():
@@ -32,6 +90,58 @@ def _get_user_id():
     return int(uid) if uid else None
 
 
+_ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+@lru_cache(maxsize=1024)
+def _parse_iso_date(value):
+    """date for a 'YYYY-MM-DD' string, else None. Malformed input is rejected by the regex without
+    raising; only well-shaped but impossible dates (e.g. 2024-02-30) reach the ValueError path."""
+    if not _ISO_DATE.fullmatch(value):
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _non_negative_int(value):
+    """value as an int if it is a non-negative JSON number or digit string, else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value if value >= 0 else None
+    if isinstance(value, float):
+        return int(value) if 0 <= value < float('inf') else None
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+def _user_and_trial(db, user_id):
+    """(user, trial_active) for user_id, loaded once per request and kept on flask.g.
+    trial_active is true only for a member whose trial has not ended yet."""
+    cached = g.get('_user_trial')
+    if cached is not None and cached[0] == user_id:
+        return cached[1], cached[2]
+    # Callers only read role, trial_ends_at and language
+    user = (
+        db.session.query(User)
+        .options(load_only(User.role, User.trial_ends_at, User.language))
+        .filter(User.id == user_id)
+        .first()
+    )
+    trial_ends_at = getattr(user, 'trial_ends_at', None) if user else None
+    trial_active = bool(
+        user
+        and getattr(user, 'role', None) == 'member'
+        and trial_ends_at
+        and trial_ends_at > datetime.utcnow()
+    )
+    g._user_trial = (user_id, user, trial_active)
+    return user, trial_active
+
+
 # ---------- Weekly Goals ----------
 @member_bp.route('/weekly-goals', methods=['GET'])
 @jwt_required()
@@ -40,122 +150,108 @@ def get_weekly_goals():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
 
         language = request.args.get('language', 'fa')
-        db = _get_db()
-        goals = (
-            db.session.query(MemberWeeklyGoal)
-            .filter_by(user_id=user_id)
-            .order_by(MemberWeeklyGoal.training_program_id, MemberWeeklyGoal.week_number)
-            .all()
-        )
+        db = g.db
 
         # During active trial, only show goals for user's own program(s)
-        from app import User
-        user = db.session.get(User, user_id)
-        trial_ends_at = getattr(user, 'trial_ends_at', None) if user else None
-        trial_active = (
-            user
-            and getattr(user, 'role', None) == 'member'
-            and trial_ends_at
-            and trial_ends_at > datetime.utcnow()
-        )
-        user_program_ids = set(
-            p.id for p in db.session.query(TrainingProgram).filter_by(user_id=user_id).all()
-        )
+        _, trial_active = _user_and_trial(db, user_id)
+        goals = _query_weekly_goals(db, user_id, trial_active, language)
+        first = next(goals, None)
 
         # If no goals exist but user has programs, seed default weekly goals
-        if not goals:
-            _seed_weekly_goals_for_user(user_id, language, db)
-            goals = (
-                db.session.query(MemberWeeklyGoal)
-                .filter_by(user_id=user_id)
-                .order_by(MemberWeeklyGoal.training_program_id, MemberWeeklyGoal.week_number)
-                .all()
-            )
-
-        out = []
-        for g in goals:
-            program = db.session.get(TrainingProgram, g.training_program_id)
-            if trial_active and program and program.user_id != user_id:
-                continue
-            if user_program_ids and program and program.user_id is None:
-                continue
-            program_name = (program.name_fa if language == 'fa' else program.name_en) if program else None
-            out.append({
-                'id': g.id,
-                'user_id': g.user_id,
-                'training_program_id': g.training_program_id,
-                'training_program_name': program_name,
-                'week_number': g.week_number,
-                'goal_title': g.goal_title_fa if language == 'fa' else g.goal_title_en,
-                'goal_title_fa': g.goal_title_fa,
-                'goal_title_en': g.goal_title_en,
-                'goal_description': (g.goal_description_fa if language == 'fa' else g.goal_description_en) or '',
-                'completed': g.completed,
-                'completed_at': g.completed_at.isoformat() if g.completed_at else None,
-                'created_at': g.created_at.isoformat() if g.created_at else None,
-            })
-        return jsonify(out), 200
+        if first is None and not db.session.query(
+            exists().where(MemberWeeklyGoal.user_id == user_id)
+        ).scalar():
+            _seed_weekly_goals_for_user(user_id, language, db, trial_active=trial_active)
+            goals = _query_weekly_goals(db, user_id, trial_active, language)
+        elif first is not None:
+            goals = chain((first,), goals)
+
+        # Every output key (language-specific title, description and program name included) is a
+        # labelled column of the projection, so each row maps straight onto its JSON object
+        return stream_json_array(dict(goal._mapping) for goal in goals)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+
+
+def _query_weekly_goals(db, user_id, trial_active=False, language='fa'):
+    """Lazy iterator (yield_per) over the member's visible weekly goals as column rows shaped like the
+    API objects: program name from the same JOIN, goal_title / goal_description / program name
+    already in the requested language (no ORM instances).
+    Visibility is filtered in SQL: during an active trial only goals of the member's own
+    program(s); otherwise general-program goals are hidden once the member has an own program."""
+    fa = language == 'fa'
+    query = (
+        db.session.query(
+            MemberWeeklyGoal.id, MemberWeeklyGoal.user_id, MemberWeeklyGoal.training_program_id,
+            (TrainingProgram.name_fa if fa else TrainingProgram.name_en).label('training_program_name'),
+            MemberWeeklyGoal.week_number,
+            (MemberWeeklyGoal.goal_title_fa if fa else MemberWeeklyGoal.goal_title_en).label('goal_title'),
+            MemberWeeklyGoal.goal_title_fa, MemberWeeklyGoal.goal_title_en,
+            func.coalesce(
+                MemberWeeklyGoal.goal_description_fa if fa else MemberWeeklyGoal.goal_description_en, ''
+            ).label('goal_description'),
+            MemberWeeklyGoal.completed, MemberWeeklyGoal.completed_at, MemberWeeklyGoal.created_at,
+        )
+        .join(TrainingProgram, MemberWeeklyGoal.training_program_id == TrainingProgram.id)
+        .filter(MemberWeeklyGoal.user_id == user_id)
+    )
+    if trial_active:
+        query = query.filter(TrainingProgram.user_id == user_id)
+    else:
+        own_program = aliased(TrainingProgram)
+        query = query.filter(or_(
+            TrainingProgram.user_id.isnot(None),
+            ~exists().where(own_program.user_id == user_id),
+        ))
+    return iter(
+        query.order_by(MemberWeeklyGoal.training_program_id, MemberWeeklyGoal.week_number)
+        .yield_per(LIST_BATCH_SIZE)
+    )
 
 
-def _seed_weekly_goals_for_user(user_id, language='fa', db=None):
-    """Create default weekly goals for each training program the member has (user-specific + general)."""
+def _seed_weekly_goals_for_user(user_id, language='fa', db=None, trial_active=None):
+    """Create default weekly goals for each training program the member has (user-specific + general).
+    Pass trial_active when the caller already knows it."""
     if db is None:
-        db = _get_db()
-    user_programs = db.session.query(TrainingProgram).filter_by(user_id=user_id).all()
-    general_programs = db.session.query(TrainingProgram).filter(TrainingProgram.user_id.is_(None)).all()
-
-    # Members should only get goals for their own program(s)
-    from app import User
-    user = db.session.get(User, user_id)
-    if user and getattr(user, 'role', None) == 'member':
-        all_programs = user_programs
-    else:
-        all_programs = user_programs + general_programs
-
-    # If user is on active trial, only seed goals for their trial program(s)
-    trial_ends_at = getattr(user, 'trial_ends_at', None) if user else None
-    trial_active = (
-        user
-        and getattr(user, 'role', None) == 'member'
-        and trial_ends_at
-        and trial_ends_at > datetime.utcnow()
+        db = g.db
+    user, user_trial_active = _user_and_trial(db, user_id)
+    if trial_active is None:
+        trial_active = user_trial_active
+    # Members (and anyone on an active trial) only get goals for their own program(s); others also
+    # for the general programs. One SELECT of (id, duration) rows covers both cases.
+    own_only = trial_active or (user and getattr(user, 'role', None) == 'member')
+    program_filter = TrainingProgram.user_id == user_id
+    if not own_only:
+        program_filter = or_(program_filter, TrainingProgram.user_id.is_(None))
+    all_programs = db.session.query(TrainingProgram.id, TrainingProgram.duration_weeks).filter(program_filter).all()
+    if not all_programs:
+        return
+    # One SELECT for the (program, week) pairs that already exist, one executemany INSERT for the rest
+    existing = set(
+        db.session.query(MemberWeeklyGoal.training_program_id, MemberWeeklyGoal.week_number)
+        .filter_by(user_id=user_id)
+        .all()
     )
-    if trial_active:
-        all_programs = user_programs
-    added = False
-    for program in all_programs:
-        duration = program.duration_weeks or 4
-        for week in range(1, duration + 1):
-            existing = (
-                db.session.query(MemberWeeklyGoal)
-                .filter_by(
-                    user_id=user_id,
-                    training_program_id=program.id,
-                    week_number=week,
-                )
-                .first()
-            )
-            if existing:
-                continue
-            title_fa = f'هفته {week}: انجام جلسات هفته {week}'
-            title_en = f'Week {week}: Complete Week {week} sessions'
-            goal = MemberWeeklyGoal(
-                user_id=user_id,
-                training_program_id=program.id,
-                week_number=week,
-                goal_title_fa=title_fa,
-                goal_title_en=title_en,
-                goal_description_fa=None,
-                goal_description_en=None,
-            )
-            db.session.add(goal)
-            added = True
-    if added:
+    titles_fa, titles_en = _week_titles(max(program.duration_weeks or 4 for program in all_programs))
+    rows = [
+        {
+            'user_id': user_id,
+            'training_program_id': program.id,
+            'week_number': week,
+            'goal_title_fa': titles_fa[week - 1],
+            'goal_title_en': titles_en[week - 1],
+            'goal_description_fa': None,
+            'goal_description_en': None,
+        }
+        for program in all_programs
+        for week in range(1, (program.duration_weeks or 4) + 1)
+        if (program.id, week) not in existing
+    ]
+    if rows:
+        db.session.execute(MemberWeeklyGoal.__table__.insert(), rows)
         db.session.commit()
 
 
@@ -165,20 +261,15 @@ def _assign_program_after_purchase(db, user_id, program_id, language='fa'):
     Tries AI-generated personalized program first (user profile + admin Training Info).
     Falls back to copying the purchased template if AI fails.
     """
-    from app import User
-    from models import TrainingProgram, MemberWeeklyGoal, MemberTrainingActionCompletion, TrainingActionNote
-
-    user = db.session.get(User, user_id)
+    user, _ = _user_and_trial(db, user_id)
     if not user or getattr(user, 'role', None) != 'member':
         return None
 
     # Remove existing user programs and related rows
     existing = db.session.query(TrainingProgram).filter_by(user_id=user_id).all()
+    # Goals, completions and notes go with the programs (ON DELETE CASCADE; explicit on SQLite)
+    delete_program_dependents(db.session, [prog.id for prog in existing])
     for prog in existing:
-        pid = prog.id
-        db.session.query(MemberWeeklyGoal).filter_by(training_program_id=pid).delete()
-        db.session.query(MemberTrainingActionCompletion).filter_by(training_program_id=pid).delete()
-        db.session.query(TrainingActionNote).filter_by(training_program_id=pid).delete()
         db.session.delete(prog)
 
     template = db.session.get(TrainingProgram, program_id)
@@ -193,9 +284,6 @@ def _assign_program_after_purchase(db, user_id, program_id, language='fa'):
         return None
 
     # Try AI-generated personalized program first
-    from services.session_ai_service import generate_personalized_program_after_purchase
-    from services.ai_debug_logger import append_ai_program_log
-    from models import UserProfile
 
     lang = getattr(user, 'language', language) or language
     sessions, ai_error = generate_personalized_program_after_purchase(user_id, program_id, lang, db)
@@ -218,8 +306,8 @@ def _assign_program_after_purchase(db, user_id, program_id, language='fa'):
         "gain_muscle": "gain_muscle", "muscle_gain": "gain_muscle", "strength": "gain_muscle",
         "gain_weight": "gain_weight", "shape_fitting": "shape_fitting", "endurance": "shape_fitting",
     }
-    for g in (goals or []):
-        g_lower = (g or "").strip().lower()
+    for goal in (goals or []):
+        g_lower = (goal or "").strip().lower()
         if g_lower in goal_to_purpose:
             purpose = goal_to_purpose[g_lower]
             break
@@ -242,7 +330,6 @@ def _assign_program_after_purchase(db, user_id, program_id, language='fa'):
         # Fallback: copy template and inject warming/cooldown from admin
         template_sessions = template.get_sessions() if hasattr(template, 'get_sessions') else []
         if isinstance(template_sessions, list):
-            from services.session_ai_service import _inject_session_phases
             for s in template_sessions:
                 if isinstance(s, dict):
                     _inject_session_phases(s, db)
@@ -283,28 +370,37 @@ def update_weekly_goal(goal_id):
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
-
-        db = _get_db()
-        goal = db.session.query(MemberWeeklyGoal).filter_by(id=goal_id, user_id=user_id).first()
-        if not goal:
-            return jsonify({'error': 'Goal not found'}), 404
+            return _INVALID_TOKEN()
 
+        db = g.db
         data = request.get_json() or {}
         completed = data.get('completed')
-        if completed is not None:
-            goal.completed = bool(completed)
-            goal.completed_at = datetime.utcnow() if goal.completed else None
+        # The owner filter authorizes and the UPDATE ... RETURNING mutates in one statement
+        owned = (MemberWeeklyGoal.id == goal_id, MemberWeeklyGoal.user_id == user_id)
+        returned = (MemberWeeklyGoal.id, MemberWeeklyGoal.completed, MemberWeeklyGoal.completed_at)
+        if completed is None:
+            goal = db.session.execute(select(*returned).where(*owned)).first()
+        else:
+            completed = bool(completed)
+            goal = db.session.execute(
+                update(MemberWeeklyGoal)
+                .where(*owned)
+                .values(completed=completed, completed_at=datetime.utcnow() if completed else None)
+                .returning(*returned)
+                .execution_options(synchronize_session=False)
+            ).first()
+        if not goal:
+            return _GOAL_NOT_FOUND()
         db.session.commit()
 
-        return jsonify({
+        return json_response({
             'id': goal.id,
             'completed': goal.completed,
-            'completed_at': goal.completed_at.isoformat() if goal.completed_at else None,
-        }), 200
+            'completed_at': goal.completed_at,
+        })
     except Exception as e:
-        _get_db().session.rollback()
-        return jsonify({'error': str(e)}), 500
+        g.db.session.rollback()
+        return json_response({'error': str(e)}, 500)
 
 
 # ---------- Purchase training program ----------
@@ -315,7 +411,7 @@ def purchase_training_program():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
 
         data = request.get_json() or {}
         program_id = data.get('program_id')
@@ -325,7 +421,7 @@ def purchase_training_program():
         language = data.get('language') or 'fa'
 
         if not program_id:
-            return jsonify({'error': 'program_id required'}), 400
+            return json_response({'error': 'program_id required'}, 400)
 
         def _sum_prices(items):
             total = 0.0
@@ -349,12 +445,12 @@ def purchase_training_program():
             total = subtotal
             status = 'pending_payment'
 
-        db = _get_db()
+        db = g.db
         # Ensure purchase_orders table exists (especially after code update)
         try:
             PurchaseOrder.__table__.create(db.engine, checkfirst=True)
         except Exception as create_err:
-            return jsonify({'error': f'Failed to ensure purchase_orders table: {create_err}'}), 500
+            return json_response({'error': f'Failed to ensure purchase_orders table: {create_err}'}, 500)
         order = PurchaseOrder(
             user_id=user_id,
             program_id=int(program_id),
@@ -375,15 +471,15 @@ def purchase_training_program():
             assigned_program_id = program.id if program else None
 
         db.session.commit()
-        return jsonify({
+        return json_response({
             'order_id': order.id,
             'status': order.status,
             'total': order.total,
             'assigned_program_id': assigned_program_id,
-        }), 200
+        })
     except Exception as e:
-        _get_db().session.rollback()
-        return jsonify({'error': str(e)}), 500
+        g.db.session.rollback()
+        return json_response({'error': str(e)}, 500)
 
 
 # ---------- Step Counter ----------
@@ -394,47 +490,41 @@ def get_steps():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
 
-        db = _get_db()
+        db = g.db
         from_date_str = request.args.get('from_date')
         to_date_str = request.args.get('to_date')
         today = date.today()
         from_date = today - timedelta(days=30)
         to_date = today
+        # Invalid values fall back to the defaults
         if from_date_str:
-            try:
-                from_date = date.fromisoformat(from_date_str)
-            except ValueError:
-                pass
+            from_date = _parse_iso_date(from_date_str) or from_date
         if to_date_str:
-            try:
-                to_date = date.fromisoformat(to_date_str)
-            except ValueError:
-                pass
+            to_date = _parse_iso_date(to_date_str) or to_date
 
         rows = (
-            db.session.query(DailySteps)
+            db.session.query(DailySteps.id, DailySteps.date, DailySteps.steps, DailySteps.source)
             .filter(
                 DailySteps.user_id == user_id,
                 DailySteps.date >= from_date,
                 DailySteps.date <= to_date,
             )
             .order_by(DailySteps.date.desc())
-            .all()
+            .yield_per(LIST_BATCH_SIZE)
         )
-        out = [
+        return stream_json_array(
             {
                 'id': r.id,
-                'date': r.date.isoformat(),
+                'date': r.date,
                 'steps': r.steps,
                 'source': r.source,
             }
             for r in rows
-        ]
-        return jsonify(out), 200
+        )
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @member_bp.route('/steps', methods=['POST'])
@@ -444,58 +534,50 @@ def post_steps():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
 
-        db = _get_db()
+        db = g.db
         data = request.get_json()
         if not data or 'steps' not in data:
-            return jsonify({'error': 'steps is required'}), 400
+            return _STEPS_REQUIRED()
 
-        steps_val = int(data.get('steps', 0))
-        if steps_val < 0:
-            return jsonify({'error': 'steps must be non-negative'}), 400
+        steps_val = _non_negative_int(data.get('steps'))
+        if steps_val is None:
+            return _STEPS_INVALID()
 
         date_str = data.get('date')
         if not date_str:
             target_date = date.today()
         else:
-            try:
-                target_date = date.fromisoformat(date_str)
-            except ValueError:
-                return jsonify({'error': 'Invalid date format (use YYYY-MM-DD)'}), 400
+            target_date = _parse_iso_date(date_str) if isinstance(date_str, str) else None
+            if target_date is None:
+                return _DATE_INVALID()
 
         source = (data.get('source') or 'manual').lower()
         if source not in ('manual', 'device'):
             source = 'manual'
 
-        row = (
-            db.session.query(DailySteps)
-            .filter_by(user_id=user_id, date=target_date)
-            .first()
+        # One INSERT ... ON CONFLICT (user_id, date) DO UPDATE; no SELECT first, no insert race
+        stmt = upsert_insert(db.session, DailySteps).values(
+            user_id=user_id, date=target_date, steps=steps_val, source=source
         )
-        if row:
-            row.steps = steps_val
-            row.source = source
-            row.updated_at = datetime.utcnow()
-        else:
-            row = DailySteps(
-                user_id=user_id,
-                date=target_date,
-                steps=steps_val,
-                source=source,
-            )
-            db.session.add(row)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['user_id', 'date'],
+            set_={'steps': stmt.excluded.steps, 'source': stmt.excluded.source, 'updated_at': datetime.utcnow()},
+        )
+        # The stored values are exactly the inputs, so only the id comes back
+        row_id = db.session.execute(stmt.returning(DailySteps.id)).scalar_one()
         db.session.commit()
 
-        return jsonify({
-            'id': row.id,
-            'date': row.date.isoformat(),
-            'steps': row.steps,
-            'source': row.source,
-        }), 200
+        return json_response({
+            'id': row_id,
+            'date': target_date,
+            'steps': steps_val,
+            'source': source,
+        })
     except Exception as e:
-        _get_db().session.rollback()
-        return jsonify({'error': str(e)}), 500
+        g.db.session.rollback()
+        return json_response({'error': str(e)}, 500)
 
 
 # ---------- Break Request ----------
@@ -506,36 +588,43 @@ def create_break_request():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
 
-        db = _get_db()
-        from app import User
-        user = db.session.get(User, user_id)
-        if not user or user.role != 'member':
-            return jsonify({'error': 'Only members can submit break requests'}), 403
+        db = g.db
+        if lookup_role(user_id) != 'member':
+            return _MEMBERS_ONLY_BREAK()
 
         data = request.get_json()
         message = (data.get('message') or '').strip()
         if not message:
-            return jsonify({'error': 'message is required'}), 400
-
-        br = BreakRequest(
-            user_id=user_id,
-            message=message,
-            status='pending',
-        )
-        db.session.add(br)
+            return _MESSAGE_REQUIRED()
+
+        # INSERT ... SELECT ... WHERE role = 'member' RETURNING id: the role is re-checked against the
+        # users table in the same statement (the cached role above may be up to ROLE_TTL old), and no ORM instance is
+        # left to be refreshed after commit
+        created_at = datetime.utcnow()
+        source = select(
+            User.id, literal(message), literal('pending'), literal(created_at)
+        ).where(User.id == user_id, User.role == 'member')
+        br_id = db.session.execute(
+            insert(BreakRequest)
+            .from_select(['user_id', 'message', 'status', 'created_at'], source)
+            .returning(BreakRequest.id)
+        ).scalar()
+        if br_id is None:
+            db.session.rollback()
+            return _MEMBERS_ONLY_BREAK()
         db.session.commit()
 
-        return jsonify({
-            'id': br.id,
-            'message': br.message,
-            'status': br.status,
-            'created_at': br.created_at.isoformat() if br.created_at else None,
-        }), 201
+        return json_response({
+            'id': br_id,
+            'message': message,
+            'status': 'pending',
+            'created_at': created_at,
+        }, 201)
     except Exception as e:
-        _get_db().session.rollback()
-        return jsonify({'error': str(e)}), 500
+        g.db.session.rollback()
+        return json_response({'error': str(e)}, 500)
 
 
 # ---------- Training action progress (tick completed exercises) ----------
@@ -546,26 +635,31 @@ def get_training_progress():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
 
-        db = _get_db()
+        db = g.db
         program_id = request.args.get('program_id', type=int)
-        q = db.session.query(MemberTrainingActionCompletion).filter_by(user_id=user_id)
+        q = db.session.query(
+            MemberTrainingActionCompletion.training_program_id,
+            MemberTrainingActionCompletion.session_index,
+            MemberTrainingActionCompletion.exercise_index,
+            MemberTrainingActionCompletion.completed_at,
+        ).filter(MemberTrainingActionCompletion.user_id == user_id)
         if program_id is not None:
-            q = q.filter_by(training_program_id=program_id)
-        rows = q.all()
+            q = q.filter(MemberTrainingActionCompletion.training_program_id == program_id)
+        rows = q.yield_per(LIST_BATCH_SIZE)
         out = [
             {
                 'training_program_id': r.training_program_id,
                 'session_index': r.session_index,
                 'exercise_index': r.exercise_index,
-                'completed_at': r.completed_at.isoformat() if r.completed_at else None,
+                'completed_at': r.completed_at,
             }
             for r in rows
         ]
-        return jsonify(out), 200
+        return json_response(out)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @member_bp.route('/training-progress', methods=['POST'])
@@ -575,64 +669,56 @@ def toggle_training_progress():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
 
-        db = _get_db()
+        db = g.db
         data = request.get_json()
         if not data or 'program_id' not in data or 'session_index' not in data or 'exercise_index' not in data:
-            return jsonify({'error': 'program_id, session_index, exercise_index required'}), 400
+            return json_response({'error': 'program_id, session_index, exercise_index required'}, 400)
 
         program_id = int(data['program_id'])
         session_index = int(data['session_index'])
         exercise_index = int(data['exercise_index'])
         completed = data.get('completed', True)
 
-        existing = (
-            db.session.query(MemberTrainingActionCompletion)
-            .filter_by(
-                user_id=user_id,
-                training_program_id=program_id,
-                session_index=session_index,
-                exercise_index=exercise_index,
-            )
-            .first()
-        )
-
+        key = {
+            'user_id': user_id,
+            'training_program_id': program_id,
+            'session_index': session_index,
+            'exercise_index': exercise_index,
+        }
         if completed:
-            if not existing:
-                row = MemberTrainingActionCompletion(
-                    user_id=user_id,
-                    training_program_id=program_id,
-                    session_index=session_index,
-                    exercise_index=exercise_index,
-                )
-                db.session.add(row)
-            else:
-                row = existing
-        else:
-            if existing:
-                db.session.delete(existing)
-            row = None
+            # Idempotent insert on uq_member_action; RETURNING is empty when the row already existed
+            stmt = upsert_insert(db.session, MemberTrainingActionCompletion).values(
+                **key, completed_at=datetime.utcnow()
+            ).on_conflict_do_nothing(
+                index_elements=['user_id', 'training_program_id', 'session_index', 'exercise_index']
+            )
+            completed_at = db.session.execute(
+                stmt.returning(MemberTrainingActionCompletion.completed_at)
+            ).scalar()
+            if completed_at is None:
+                completed_at = db.session.query(MemberTrainingActionCompletion.completed_at).filter_by(**key).scalar()
+            db.session.commit()
+            return json_response({
+                'training_program_id': program_id,
+                'session_index': session_index,
+                'exercise_index': exercise_index,
+                'completed': True,
+                'completed_at': completed_at,
+            })
 
+        db.session.query(MemberTrainingActionCompletion).filter_by(**key).delete(synchronize_session=False)
         db.session.commit()
-
-        if row:
-            return jsonify({
-                'training_program_id': row.training_program_id,
-                'session_index': row.session_index,
-                'exercise_index': row.exercise_index,
-                'completed': True,
-                'completed_at': row.completed_at.isoformat() if row.completed_at else None,
-            }), 200
-        return jsonify({
+        return json_response({
             'training_program_id': program_id,
             'session_index': session_index,
             'exercise_index': exercise_index,
             'completed': False,
-        }), 200
+        })
     except Exception as e:
-        _get_db().session.rollback()
-        return jsonify({'error': str(e)}), 500
+        g.db.session.rollback()
+        return json_response({'error': str(e)}, 500)
 
 
 # ---------- Notifications (trainer notes etc.) ----------
@@ -643,45 +729,60 @@ def get_notifications():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
 
-        db = _get_db()
+        db = g.db
         if not db:
-            return jsonify({'error': 'Database not available'}), 500
+            return json_response({'error': 'Database not available'}, 500)
 
         language = request.args.get('language', 'fa')
+        lang = 'fa' if language == 'fa' else 'en'
         unread_only = request.args.get('unread_only', '').lower() == 'true'
 
         try:
-            q = db.session.query(Notification).filter_by(user_id=user_id).order_by(Notification.created_at.desc())
+            # ORDER BY matches idx_notifications_user_created (user_id, created_at DESC), so LIMIT stops early
+            # Only the columns serialized below, in the requested language (body_* are large TEXT)
+            q = (
+                db.session.query(Notification)
+                .options(load_only(
+                    Notification.id,
+                    getattr(Notification, f'title_{lang}'),
+                    getattr(Notification, f'body_{lang}'),
+                    Notification.type, Notification.link, Notification.voice_url,
+                    Notification.read_at, Notification.created_at,
+                ))
+                .filter_by(user_id=user_id)
+                .order_by(Notification.created_at.desc())
+            )
             if unread_only:
                 q = q.filter(Notification.read_at.is_(None))
             rows = q.limit(100).all()
         except Exception as table_err:
             # Table might not exist yet (migration not run); return empty list so UI works
-            import traceback
             print(f"[member/notifications] Query failed (table may not exist): {table_err}")
             traceback.print_exc()
-            return jsonify([]), 200
+            return json_response([])
 
-        out = []
-        for r in rows:
-            out.append({
+        get_title = attrgetter(f'title_{lang}')
+        get_body = attrgetter(f'body_{lang}')
+        out = [
+            {
                 'id': r.id,
-                'title': r.title_fa if language == 'fa' else r.title_en,
-                'body': (r.body_fa if language == 'fa' else r.body_en) or '',
+                'title': get_title(r),
+                'body': get_body(r) or '',
                 'type': r.type,
                 'link': r.link or '',
                 'voice_url': r.voice_url or '',
-                'read_at': r.read_at.isoformat() if r.read_at else None,
-                'created_at': r.created_at.isoformat() if r.created_at else None,
-            })
-        return jsonify(out), 200
+                'read_at': r.read_at,
+                'created_at': r.created_at,
+            }
+            for r in rows
+        ]
+        return json_response(out)
     except Exception as e:
-        import traceback
         print(f"[member/notifications] Error: {e}")
         traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @member_bp.route('/notifications/<int:notification_id>/read', methods=['PATCH'])
@@ -691,19 +792,23 @@ def mark_notification_read(notification_id):
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
-
-        db = _get_db()
-        n = db.session.query(Notification).filter_by(id=notification_id, user_id=user_id).first()
+            return _INVALID_TOKEN()
+
+        db = g.db
+        n = db.session.execute(
+            update(Notification)
+            .where(Notification.id == notification_id, Notification.user_id == user_id)
+            .values(read_at=datetime.utcnow())
+            .returning(Notification.id, Notification.read_at)
+            .execution_options(synchronize_session=False)
+        ).first()
         if not n:
-            return jsonify({'error': 'Notification not found'}), 404
-
-        n.read_at = datetime.utcnow()
+            return _NOTIFICATION_NOT_FOUND()
         db.session.commit()
-        return jsonify({'id': n.id, 'read_at': n.read_at.isoformat()}), 200
+        return json_response({'id': n.id, 'read_at': n.read_at})
     except Exception as e:
-        _get_db().session.rollback()
-        return jsonify({'error': str(e)}), 500
+        g.db.session.rollback()
+        return json_response({'error': str(e)}, 500)
 
 
 @member_bp.route('/notifications/read-all', methods=['PATCH'])
@@ -713,15 +818,18 @@ def mark_all_notifications_read():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
 
-        db = _get_db()
-        db.session.query(Notification).filter_by(user_id=user_id).filter(Notification.read_at.is_(None)).update({'read_at': datetime.utcnow()})
+        db = g.db
+        # Served by the partial index idx_notifications_user_unread_created; no in-session objects to sync
+        db.session.query(Notification).filter_by(user_id=user_id).filter(Notification.read_at.is_(None)).update(
+            {'read_at': datetime.utcnow()}, synchronize_session=False
+        )
         db.session.commit()
-        return jsonify({'message': 'ok'}), 200
+        return _OK()
     except Exception as e:
-        _get_db().session.rollback()
-        return jsonify({'error': str(e)}), 500
+        g.db.session.rollback()
+        return json_response({'error': str(e)}, 500)
 
 
 # ---------- 7-day free trial ----------
@@ -729,58 +837,33 @@ def mark_all_notifications_read():
 @jwt_required()
 def get_trial_status():
     """
-    Get current member's trial status. Creates a 'trial_ended' notification once when trial has ended.
+    Get current member's trial status (read-only; the one-time 'trial_ended' notification is
+    created by services.trial_notifications).
     Returns: trial_ends_at, is_trial_active, days_left, trial_ended.
     """
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
 
-        from app import User
-        db = _get_db()
-        user = db.session.get(User, user_id)
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        row = g.db.session.query(User.trial_ends_at).filter(User.id == user_id).first()
+        if row is None:
+            return json_response({'error': 'User not found'}, 404)
 
-        trial_ends_at = getattr(user, 'trial_ends_at', None)
+        trial_ends_at = row.trial_ends_at
         now = datetime.utcnow()
         is_trial_active = trial_ends_at is not None and trial_ends_at > now
         trial_ended = trial_ends_at is not None and trial_ends_at <= now
+        days_left = (trial_ends_at - now).days if is_trial_active else None
 
-        if trial_ended:
-            # Ensure we send trial-ended notification once
-            existing = db.session.query(Notification).filter_by(
-                user_id=user_id, type='trial_ended'
-            ).first()
-            if not existing:
-                lang = getattr(user, 'language', 'fa') or 'fa'
-                n = Notification(
-                    user_id=user_id,
-                    title_fa='پایان دوره آزمایشی',
-                    title_en='Free trial ended',
-                    body_fa='دوره ۷ روزه رایگان شما به پایان رسید. برای ادامه استفاده از تمام امکانات تمرینی، اشتراک تهیه کنید.',
-                    body_en='Your 7-day free trial has ended. Subscribe to continue using all training features.',
-                    type='trial_ended',
-                    link='?tab=profile',
-                )
-                db.session.add(n)
-                db.session.commit()
-
-        days_left = None
-        if trial_ends_at and is_trial_active:
-            delta = trial_ends_at - now
-            days_left = max(0, delta.days) if delta.days else 0
-
-        return jsonify({
-            'trial_ends_at': trial_ends_at.isoformat() if trial_ends_at else None,
+        return json_response({
+            'trial_ends_at': trial_ends_at,
             'is_trial_active': is_trial_active,
             'days_left': days_left,
             'trial_ended': trial_ended,
-        }), 200
+        })
     except Exception as e:
-        _get_db().session.rollback()
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 # ---------- Trainer notes for current action (member view) ----------
@@ -791,30 +874,37 @@ def get_action_notes_for_member():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
 
         program_id = request.args.get('program_id', type=int)
         if program_id is None:
-            return jsonify({'error': 'program_id required'}), 400
+            return json_response({'error': 'program_id required'}, 400)
 
-        db = _get_db()
+        db = g.db
+        language = request.args.get('language', 'fa')
+        note_col = TrainingActionNote.note_fa if language == 'fa' else TrainingActionNote.note_en
         rows = (
-            db.session.query(TrainingActionNote)
-            .filter_by(training_program_id=program_id)
-            .all()
+            db.session.query(
+                TrainingActionNote.session_index,
+                TrainingActionNote.exercise_index,
+                note_col.label('note'),
+                TrainingActionNote.voice_url,
+            )
+            .filter(TrainingActionNote.training_program_id == program_id)
+            .yield_per(LIST_BATCH_SIZE)
         )
-        language = request.args.get('language', 'fa')
-        out = []
-        for r in rows:
-            out.append({
+        out = [
+            {
                 'session_index': r.session_index,
                 'exercise_index': r.exercise_index,
-                'note': (r.note_fa if language == 'fa' else r.note_en) or '',
+                'note': r.note or '',
                 'voice_url': r.voice_url or '',
-            })
-        return jsonify(out), 200
+            }
+            for r in rows
+        ]
+        return json_response(out)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @member_bp.route('/progress-check-request', methods=['POST'])
@@ -824,22 +914,20 @@ def create_progress_check_request():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
-        db = _get_db()
+            return _INVALID_TOKEN()
+        db = g.db
         req = ProgressCheckRequest(member_id=user_id, status='pending')
         db.session.add(req)
         db.session.commit()
-        return jsonify({
+        return json_response({
             'id': req.id,
             'status': req.status,
-            'requested_at': req.requested_at.isoformat() if req.requested_at else None,
+            'requested_at': req.requested_at,
             'message': 'Progress check requested. Your trainer will respond shortly.'
-        }), 201
+        }, 201)
     except Exception as e:
-        db = _get_db()
-        if db:
-            db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+        g.db.session.rollback()
+        return json_response({'error': str(e)}, 500)
 
 
 @member_bp.route('/progress-check-requests', methods=['GET'])
@@ -849,100 +937,86 @@ def list_my_progress_check_requests():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
-        db = _get_db()
+            return _INVALID_TOKEN()
+        db = g.db
         rows = (
-            db.session.query(ProgressCheckRequest)
+            db.session.query(
+                ProgressCheckRequest.id, ProgressCheckRequest.status,
+                ProgressCheckRequest.requested_at, ProgressCheckRequest.responded_at,
+            )
             .filter_by(member_id=user_id)
             .order_by(ProgressCheckRequest.requested_at.desc())
             .limit(20)
-            .all()
         )
-        out = []
-        for r in rows:
-            out.append({
-                'id': r.id,
-                'status': r.status,
-                'requested_at': r.requested_at.isoformat() if r.requested_at else None,
-                'responded_at': r.responded_at.isoformat() if r.responded_at else None,
-            })
-        return jsonify(out), 200
+        # Rows are already shaped like the response objects
+        return json_response([dict(r._mapping) for r in rows])
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @member_bp.route('/session-phases', methods=['GET'])
 @jwt_required()
+@cached_response('session_phases', ttl=300, per_user=False)
 def get_session_phases():
     """Get warming, cooldown, ending message content for training session steps (from site settings)."""
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
-        db = _get_db()
-        from models import SiteSettings
-        row = db.session.query(SiteSettings).first()
-        raw = (getattr(row, 'session_phases_json', None) or '').strip() if row else ''
-        if not raw:
-            return jsonify({
-                'warming': {'title_fa': '', 'title_en': '', 'steps': []},
-                'cooldown': {'title_fa': '', 'title_en': '', 'steps': []},
-                'ending_message_fa': '',
-                'ending_message_en': ''
-            }), 200
-        import json
-        data = json.loads(raw)
-        return jsonify(data), 200
+            return _INVALID_TOKEN()
+        data = load_session_phases(g.db)
+        return json_response(data if data is not None else EMPTY_SESSION_PHASES)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
+# One hour with Redis; without it the in-process copy is capped at LOCAL_MAX_TTL (invalidation is per worker)
 @member_bp.route('/exercise-info', methods=['GET'])
 @jwt_required()
+@cached_response('exercises', ttl=3600, per_user=False)
 def get_exercise_info_by_name():
     """Get movement info (video, voice, trainer notes) for an exercise by name. Query: name_fa, name_en (optional)."""
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
 
         name_fa = (request.args.get('name_fa') or '').strip()
         name_en = (request.args.get('name_en') or '').strip()
         if not name_fa and not name_en:
-            return jsonify({'error': 'name_fa or name_en required'}), 400
-
-        db = _get_db()
-        q = db.session.query(Exercise)
-        if name_fa and name_en:
-            ex = q.filter((Exercise.name_fa == name_fa) | (Exercise.name_en == name_en)).first()
-        elif name_fa:
-            ex = q.filter_by(name_fa=name_fa).first()
-        else:
-            ex = q.filter_by(name_en=name_en).first()
+            return json_response({'error': 'name_fa or name_en required'}, 400)
+
+        db = g.db
+        # Case-insensitive match served by the lower(name_fa) / lower(name_en) expression indexes
+        conditions = []
+        if name_fa:
+            conditions.append(func.lower(Exercise.name_fa) == name_fa.lower())
+        if name_en:
+            conditions.append(func.lower(Exercise.name_en) == name_en.lower())
+        ex = db.session.query(Exercise).filter(or_(*conditions)).first()
 
         if not ex:
-            return jsonify({'video_url': '', 'voice_url': '', 'trainer_notes': '', 'note_notify_at_seconds': None, 'ask_post_set_questions': False, 'target_muscle': ''}), 200
+            return json_response({'video_url': '', 'voice_url': '', 'trainer_notes': '', 'note_notify_at_seconds': None, 'ask_post_set_questions': False, 'target_muscle': ''})
 
-        language = request.args.get('language', 'fa')
-        return jsonify({
+        lang = 'fa' if request.args.get('language', 'fa') == 'fa' else 'en'
+        return json_response({
             'id': ex.id,
             'name_fa': ex.name_fa,
             'name_en': ex.name_en,
             'video_url': ex.video_url or '',
             'voice_url': ex.voice_url or '',
-            'trainer_notes': (ex.trainer_notes_fa if language == 'fa' else ex.trainer_notes_en) or '',
+            'trainer_notes': getattr(ex, f'trainer_notes_{lang}') or '',
             'note_notify_at_seconds': getattr(ex, 'note_notify_at_seconds', None),
             'ask_post_set_questions': getattr(ex, 'ask_post_set_questions', False),
-            'target_muscle': (ex.target_muscle_fa if language == 'fa' else ex.target_muscle_en) or '',
-        }), 200
+            'target_muscle': getattr(ex, f'target_muscle_{lang}') or '',
+        })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 # ---------- Session AI: adapt by mood, end message, post-set feedback ----------
 def _get_member_program(user_id, program_id):
     """Return TrainingProgram if it belongs to this member."""
-    db = _get_db()
+    db = g.db
     return db.session.query(TrainingProgram).filter_by(id=program_id, user_id=user_id).first()
 
 
@@ -957,7 +1031,7 @@ def generate_next_sessions(program_id):
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
         data = request.get_json() or {}
         start_session_index = data.get('start_session_index')
         count = data.get('count', 2)
@@ -966,33 +1040,30 @@ def generate_next_sessions(program_id):
 
         program = _get_member_program(user_id, program_id)
         if not program:
-            return jsonify({'error': 'Program not found'}), 404
+            return json_response({'error': 'Program not found'}, 404)
 
         sessions_list = program.get_sessions() or []
         if start_session_index is None:
             start_session_index = len(sessions_list)
 
         if start_session_index < 0:
-            return jsonify({'error': 'Invalid start_session_index'}), 400
+            return json_response({'error': 'Invalid start_session_index'}, 400)
 
         # Need previous session for context when not at the beginning
         previous_session = None
         if start_session_index > 0:
             if start_session_index > len(sessions_list):
-                return jsonify({
+                return json_response({
                     'error': 'Cannot generate: previous sessions missing. Generate in order (e.g. complete session 1 before generating 2-3).',
-                }), 400
+                }, 400)
             previous_session = sessions_list[start_session_index - 1]
 
         # Get template program_id for AI config (use purchased template if available)
         template_id = program_id
-        db = _get_db()
-        from app import User
-        user = db.session.get(User, user_id) if db else None
+        db = g.db
+        user = _user_and_trial(db, user_id)[0] if db else None
         lang = (user.language if user and user.language else language) or language
 
-        from services.session_ai_service import generate_sessions_for_position
-        from services.ai_debug_logger import append_ai_program_log
 
         new_sessions, ai_error = generate_sessions_for_position(
             user_id=user_id,
@@ -1012,7 +1083,7 @@ def generate_next_sessions(program_id):
                 start_session_index=start_session_index,
                 error=ai_error or "AI returned no sessions",
             )
-            return jsonify({'error': ai_error or 'AI could not generate sessions'}), 500
+            return json_response({'error': ai_error or 'AI could not generate sessions'}, 500)
 
         # Append new sessions to program
         updated_sessions = sessions_list + new_sessions
@@ -1027,14 +1098,22 @@ def generate_next_sessions(program_id):
             sessions_count=len(new_sessions),
         )
 
-        return jsonify({
+        return json_response({
             'sessions': new_sessions,
             'program': program.to_dict(lang),
-        }), 200
+        })
     except Exception as e:
-        import traceback
         print(f"[generate_next_sessions] Error: {e}\n{traceback.format_exc()}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+
+
+_CANCEL_PLAN_SQL = text("""
+    WITH p AS (SELECT id FROM training_programs WHERE id = :pid AND user_id = :uid),
+    d1 AS (DELETE FROM member_weekly_goals WHERE training_program_id IN (SELECT id FROM p)),
+    d2 AS (DELETE FROM member_training_action_completions WHERE training_program_id IN (SELECT id FROM p)),
+    d3 AS (DELETE FROM training_action_notes WHERE training_program_id IN (SELECT id FROM p))
+    DELETE FROM training_programs WHERE id IN (SELECT id FROM p) RETURNING id
+""")
 
 
 @member_bp.route('/training-programs/<int:program_id>', methods=['DELETE'])
@@ -1044,25 +1123,33 @@ def cancel_training_plan(program_id):
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
-
-        db = _get_db()
-        program = _get_member_program(user_id, program_id)
-        if not program:
-            return jsonify({'error': 'Program not found or you cannot cancel this plan'}), 404
-
-        from models import MemberWeeklyGoal, MemberTrainingActionCompletion, TrainingActionNote
-
-        pid = program.id
-        db.session.query(MemberWeeklyGoal).filter_by(training_program_id=pid).delete()
-        db.session.query(MemberTrainingActionCompletion).filter_by(training_program_id=pid).delete()
-        db.session.query(TrainingActionNote).filter_by(training_program_id=pid).delete()
-        db.session.delete(program)
+            return _INVALID_TOKEN()
+
+        db = g.db
+        if db.session.get_bind().dialect.name == 'postgresql':
+            # One round trip: the ownership check and all four DELETEs run as a single statement,
+            # with or without ON DELETE CASCADE on the child tables
+            deleted = db.session.execute(_CANCEL_PLAN_SQL, {'pid': program_id, 'uid': user_id}).scalar()
+            if deleted is None:
+                return json_response({'error': 'Program not found or you cannot cancel this plan'}, 404)
+        else:
+            # SQLite has no DELETE in WITH and existing tables have no CASCADE
+            # Ownership is a single bool; no TrainingProgram instance (with its sessions JSON) is loaded
+            owned = db.session.query(
+                exists().where(TrainingProgram.id == program_id, TrainingProgram.user_id == user_id)
+            ).scalar()
+            if not owned:
+                return json_response({'error': 'Program not found or you cannot cancel this plan'}, 404)
+            pid = program_id
+            db.session.query(MemberWeeklyGoal).filter_by(training_program_id=pid).delete()
+            db.session.query(MemberTrainingActionCompletion).filter_by(training_program_id=pid).delete()
+            db.session.query(TrainingActionNote).filter_by(training_program_id=pid).delete()
+            db.session.query(TrainingProgram).filter_by(id=pid).delete(synchronize_session=False)
         db.session.commit()
-        return jsonify({'message': 'Plan cancelled'}), 200
+        return json_response({'message': 'Plan cancelled'})
     except Exception as e:
-        _get_db().session.rollback()
-        return jsonify({'error': str(e)}), 500
+        g.db.session.rollback()
+        return json_response({'error': str(e)}, 500)
 
 
 @member_bp.route('/adapt-session', methods=['POST'])
@@ -1072,27 +1159,25 @@ def adapt_session():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
         data = request.get_json() or {}
         program_id = data.get('program_id')
         session_index = data.get('session_index', 0)
         mood_or_message = (data.get('mood_or_message') or '').strip()
         language = data.get('language') or 'fa'
         if program_id is None:
-            return jsonify({'error': 'program_id required'}), 400
+            return json_response({'error': 'program_id required'}, 400)
         program = _get_member_program(user_id, int(program_id))
         if not program:
-            return jsonify({'error': 'Program not found'}), 404
+            return json_response({'error': 'Program not found'}, 404)
         sessions_list = program.get_sessions()
         if session_index < 0 or session_index >= len(sessions_list):
-            return jsonify({'error': 'Invalid session_index'}), 400
+            return json_response({'error': 'Invalid session_index'}, 400)
         session_obj = sessions_list[session_index]
-        from services.session_ai_service import adapt_session_by_mood
         result = adapt_session_by_mood(session_obj, mood_or_message, language)
         adapted_exercises = result.get('exercises', session_obj.get('exercises', []))
         extra_advice = result.get('extra_advice', '')
         try:
-            from services.ai_debug_logger import append_log
             append_log(
                 message=f"Mood adapt | user_id={user_id} program_id={program_id} session_index={session_index} mood={mood_or_message[:100]}",
                 response=extra_advice[:200] if extra_advice else "Session adapted (sets/reps adjusted)",
@@ -1109,12 +1194,12 @@ def adapt_session():
             )
         except Exception:
             pass
-        return jsonify({
+        return json_response({
             'session': {**session_obj, 'exercises': adapted_exercises},
             'extra_advice': extra_advice,
-        }), 200
+        })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @member_bp.route('/session-end-message', methods=['POST'])
@@ -1124,15 +1209,14 @@ def session_end_message():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
         data = request.get_json() or {}
         language = data.get('language') or 'fa'
         session_name = data.get('session_name') or ''
-        from services.session_ai_service import get_session_end_encouragement
         message = get_session_end_encouragement(language, session_name)
-        return jsonify({'message': message}), 200
+        return json_response({'message': message})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @member_bp.route('/post-set-feedback', methods=['POST'])
@@ -1142,20 +1226,19 @@ def post_set_feedback():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
         data = request.get_json() or {}
         exercise_name_fa = (data.get('exercise_name_fa') or '').strip()
         exercise_name_en = (data.get('exercise_name_en') or '').strip()
         target_muscle = (data.get('target_muscle') or '').strip()
         answers = data.get('answers') or {}
         language = data.get('language') or 'fa'
-        from services.session_ai_service import get_post_set_feedback
         feedback = get_post_set_feedback(
             exercise_name_fa, exercise_name_en, answers, target_muscle, language
         )
-        return jsonify({'feedback': feedback}), 200
+        return json_response({'feedback': feedback})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @member_bp.route('/break-requests', methods=['GET'])
@@ -1165,27 +1248,29 @@ def list_my_break_requests():
     try:
         user_id = _get_user_id()
         if not user_id:
-            return jsonify({'error': 'Invalid token'}), 401
+            return _INVALID_TOKEN()
 
-        db = _get_db()
+        db = g.db
         rows = (
-            db.session.query(BreakRequest)
-            .filter_by(user_id=user_id)
+            db.session.query(
+                BreakRequest.id, BreakRequest.message, BreakRequest.status,
+                BreakRequest.created_at, BreakRequest.responded_at, BreakRequest.response_message,
+            )
+            .filter(BreakRequest.user_id == user_id)
             .order_by(BreakRequest.created_at.desc())
             .limit(50)
-            .all()
+            .yield_per(LIST_BATCH_SIZE)
         )
-        out = [
+        return stream_json_array(
             {
                 'id': r.id,
                 'message': r.message,
                 'status': r.status,
-                'created_at': r.created_at.isoformat() if r.created_at else None,
-                'responded_at': r.responded_at.isoformat() if r.responded_at else None,
+                'created_at': r.created_at,
+                'responded_at': r.responded_at,
                 'response_message': r.response_message,
             }
             for r in rows
-        ]
-        return jsonify(out), 200
+        )
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
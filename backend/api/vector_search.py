@@ -66,27 +66,10 @@ def get_user_profile_for_search(user_id: int) -> Dict[str, Any]:
             'preferred_intensity': None
         }
     
-    # Parse JSON fields
-    equipment_access = []
-    if profile.equipment_access:
-        try:
-            import json
-            equipment_access = json.loads(profile.equipment_access)
-        except:
-            equipment_access = []
-    
-    injuries = []
-    if profile.injuries:
-        try:
-            import json
-            injuries = json.loads(profile.injuries)
-        except:
-            injuries = []
-    
     return {
         'gym_access': profile.gym_access or False,
-        'equipment_access': equipment_access,
-        'injuries': injuries,
+        'equipment_access': profile.get_equipment_access(),
+        'injuries': profile.get_injuries(),
         'training_level': profile.training_level,
         'preferred_intensity': profile.preferred_intensity
     }
@@ -144,13 +127,7 @@ def get_recommendations():
             return jsonify({'error': 'User profile not found'}), 404
         
         # Build query based on user goals
-        import json
-        fitness_goals = []
-        if profile.fitness_goals:
-            try:
-                fitness_goals = json.loads(profile.fitness_goals)
-            except:
-                pass
+        fitness_goals = profile.get_fitness_goals()
         
         # Generate query text
         if language == 'fa':
@@ -4,50 +4,40 @@ Admin routes (status, source, reindex) are in admin_api.py.
 This file only has the query route for authenticated users.
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
+from services.json_response import static_json_response
+from services.role_cache import lookup_role
 from services.website_kb import search_kb
 
 
 website_kb_bp = Blueprint('website_kb', __name__, url_prefix='/api')
 
-
-def _get_db():
-    return current_app.extensions['sqlalchemy']
-
-
-def _get_user_model():
-    from app import User
-    return User
-
-
-def _get_current_user():
-    user_id_str = get_jwt_identity()
-    if not user_id_str:
-        return None
-    try:
-        db = _get_db()
-        User = _get_user_model()
-        return db.session.get(User, int(user_id_str))
-    except (ValueError, TypeError):
-        return None
+_INVALID_TOKEN = static_json_response({'error': 'Invalid token'}, 401)
+_QUERY_REQUIRED = static_json_response({'error': 'Query is required'}, 400)
 
 
 @website_kb_bp.route('/website-kb/query', methods=['POST'])
 @jwt_required()
 def kb_query():
-    user = _get_current_user()
-    if not user:
-        return jsonify({'error': 'Invalid token'}), 401
+    # Role cache (deletions leave a '' tombstone), then a fresh token claim, then one column;
+    # never the full User row ('' = no such user)
+    try:
+        user_id = int(get_jwt_identity())
+    except (TypeError, ValueError):
+        return _INVALID_TOKEN()
+    if not lookup_role(user_id):
+        return _INVALID_TOKEN()
     data = request.get_json() or {}
     query = data.get('query') or ''
     if not query.strip():
-        return jsonify({'error': 'Query is required'}), 400
+        return _QUERY_REQUIRED()
     top_k = data.get('top_k', 3)
-    try:
+    # Guard instead of try/int(): anything but an integer or a digit string means the default
+    if isinstance(top_k, str) and top_k.isdigit():
         top_k = int(top_k)
-    except (ValueError, TypeError):
+    elif not isinstance(top_k, int) or isinstance(top_k, bool):
         top_k = 3
     results = search_kb(query, top_k=top_k)
     return jsonify({'query': query, 'results': results}), 200
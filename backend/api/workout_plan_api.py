@@ -7,7 +7,6 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from models import UserProfile, Exercise
 from services.workout_plan_generator import WorkoutPlanGenerator
-import json
 
 workout_plan_bp = Blueprint('workout_plan', __name__, url_prefix='/api/workout-plan')
 
@@ -155,12 +154,7 @@ def _get_exercise_pool(user_profile: UserProfile) -> list:
     
     # Filter out exercises with user's injuries
     if user_profile.injuries:
-        try:
-            injuries = json.loads(user_profile.injuries) if isinstance(user_profile.injuries, str) else user_profile.injuries
-        except:
-            injuries = []
-        
-        for injury in injuries:
+        for injury in user_profile.injuries:
             # Exclude exercises that have this injury in contraindications
             query = query.filter(
                 ~Exercise.injury_contraindications.contains(injury)
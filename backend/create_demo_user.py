@@ -47,11 +47,11 @@ def create_demo_user():
             height=175.0,
             gender='male',
             training_level='intermediate',
-            fitness_goals=json.dumps(['muscle_gain', 'strength'], ensure_ascii=False),
-            injuries=json.dumps(['knee'], ensure_ascii=False),
-            equipment_access=json.dumps(['machine', 'dumbbells'], ensure_ascii=False),
+            fitness_goals=['muscle_gain', 'strength'],
+            injuries=['knee'],
+            equipment_access=['machine', 'dumbbells'],
             gym_access=True,
-            home_equipment=json.dumps(['dumbbells', 'resistance_bands'], ensure_ascii=False),
+            home_equipment=['dumbbells', 'resistance_bands'],
             preferred_workout_time='evening',
             workout_days_per_week=4,
             preferred_intensity='medium',
@@ -0,0 +1,35 @@
+"""
+Migration: (user_id, created_at DESC) index on break_requests for the member's newest-first list.
+Daily steps (uq_user_date_steps) and weekly goals (uq_member_program_week) are already covered by
+their unique constraints.
+
+Run once: python migrate_break_request_indexes.py
+"""
+
+from app import app, db
+from sqlalchemy import text
+
+
+INDEXES = [
+    ("idx_break_requests_user_created", "break_requests", "user_id, created_at DESC"),
+]
+
+
+def migrate():
+    with app.app_context():
+        try:
+            for name, table_name, columns in INDEXES:
+                db.session.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table_name} ({columns})"))
+                print(f"[OK] {name}")
+            db.session.commit()
+            print("[OK] Migration done.")
+        except Exception as e:
+            db.session.rollback()
+            print(f"[ERROR] {e}")
+            import traceback
+            traceback.print_exc()
+            raise
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,45 @@
+"""
+Migration: add indexes backing the exercise list filters (category, category+level, level)
+and keyset pagination on id within a category/level, plus lower(name_fa) / lower(name_en)
+for the member exercise-info lookup by name (case-insensitive).
+
+Run once: python migrate_exercise_indexes.py
+"""
+
+from app import app, db
+from sqlalchemy import text
+
+
+INDEXES = [
+    ("idx_exercises_category_level", "exercises", "category, level"),
+    ("idx_exercises_category_id", "exercises", "category, id"),
+    ("idx_exercises_level_id", "exercises", "level, id"),
+    ("idx_exercises_name_fa_lower", "exercises", "lower(name_fa)"),
+    ("idx_exercises_name_en_lower", "exercises", "lower(name_en)"),
+]
+
+# Superseded by idx_exercises_level_id and the lower(name) indexes
+DROPPED_INDEXES = ["idx_exercises_level", "idx_exercises_name_fa", "idx_exercises_name_en"]
+
+
+def migrate():
+    with app.app_context():
+        try:
+            for name, table_name, columns in INDEXES:
+                db.session.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table_name} ({columns})"))
+                print(f"[OK] {name}")
+            for name in DROPPED_INDEXES:
+                db.session.execute(text(f"DROP INDEX IF EXISTS {name}"))
+                print(f"[OK] dropped {name}")
+            db.session.commit()
+            print("[OK] Migration done.")
+        except Exception as e:
+            db.session.rollback()
+            print(f"[ERROR] {e}")
+            import traceback
+            traceback.print_exc()
+            raise
+
+
+if __name__ == "__main__":
+    migrate()
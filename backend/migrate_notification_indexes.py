@@ -0,0 +1,65 @@
+"""
+Migration: indexes for the member notification endpoints.
+- idx_notifications_user_created: (user_id, created_at DESC) for the newest-first listing
+- idx_notifications_user_unread_created: same, partial on unread rows (unread_only, mark-all-read)
+- idx_notifications_user_trial_ended: UNIQUE (user_id) WHERE type = 'trial_ended', so /trial-status
+  can INSERT ... ON CONFLICT DO NOTHING instead of SELECTing first (duplicates are removed first)
+
+Run once: python migrate_notification_indexes.py
+"""
+
+from app import app, db
+from sqlalchemy import text
+
+
+# (name, table, columns, WHERE clause or None) - PostgreSQL and SQLite both support partial indexes
+INDEXES = [
+    ("idx_notifications_user_created", "notifications", "user_id, created_at DESC", None),
+    ("idx_notifications_user_unread_created", "notifications", "user_id, created_at DESC", "read_at IS NULL"),
+]
+
+UNIQUE_INDEXES = [
+    ("idx_notifications_user_trial_ended", "notifications", "user_id", "type = 'trial_ended'"),
+]
+
+# Keep the oldest trial_ended notification per user so the unique index can be built
+DEDUPE_SQL = (
+    "DELETE FROM notifications WHERE type = 'trial_ended' AND id NOT IN "
+    "(SELECT MIN(id) FROM notifications WHERE type = 'trial_ended' GROUP BY user_id)"
+)
+
+# Superseded by idx_notifications_user_unread_created
+DROPPED_INDEXES = ["idx_notifications_user_unread"]
+
+
+def migrate():
+    with app.app_context():
+        try:
+            for name, table_name, columns, where in INDEXES:
+                sql = f"CREATE INDEX IF NOT EXISTS {name} ON {table_name} ({columns})"
+                if where:
+                    sql += f" WHERE {where}"
+                db.session.execute(text(sql))
+                print(f"[OK] {name}")
+            removed = db.session.execute(text(DEDUPE_SQL)).rowcount
+            print(f"[OK] removed {removed} duplicate trial_ended notification(s)")
+            for name, table_name, columns, where in UNIQUE_INDEXES:
+                db.session.execute(text(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table_name} ({columns}) WHERE {where}"
+                ))
+                print(f"[OK] {name}")
+            for name in DROPPED_INDEXES:
+                db.session.execute(text(f"DROP INDEX IF EXISTS {name}"))
+                print(f"[OK] dropped {name}")
+            db.session.commit()
+            print("[OK] Migration done.")
+        except Exception as e:
+            db.session.rollback()
+            print(f"[ERROR] {e}")
+            import traceback
+            traceback.print_exc()
+            raise
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,53 @@
+"""
+Migration: make the training_program_id foreign keys of weekly goals, action completions and
+action notes ON DELETE CASCADE, so deleting a training program removes its rows in the same statement.
+
+PostgreSQL only; SQLite cannot alter an existing foreign key (new SQLite databases get CASCADE
+from db.create_all()).
+
+Run once: python migrate_training_program_cascade.py
+"""
+
+from app import app, db
+from sqlalchemy import text, inspect
+
+
+TABLES = [
+    "member_weekly_goals",
+    "member_training_action_completions",
+    "training_action_notes",
+]
+
+
+def migrate():
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            print("[OK] Not PostgreSQL - skipping (SQLite keeps its existing foreign keys).")
+            return
+        try:
+            insp = inspect(db.engine)
+            for table_name in TABLES:
+                for fk in insp.get_foreign_keys(table_name):
+                    if fk["referred_table"] != "training_programs" or fk["constrained_columns"] != ["training_program_id"]:
+                        continue
+                    if (fk.get("options") or {}).get("ondelete", "").upper() == "CASCADE":
+                        print(f"[OK] {fk['name']} already cascades")
+                        continue
+                    db.session.execute(text(f'ALTER TABLE {table_name} DROP CONSTRAINT "{fk["name"]}"'))
+                    db.session.execute(text(
+                        f'ALTER TABLE {table_name} ADD CONSTRAINT "{fk["name"]}" FOREIGN KEY (training_program_id) '
+                        f'REFERENCES training_programs (id) ON DELETE CASCADE'
+                    ))
+                    print(f"[OK] {fk['name']} -> ON DELETE CASCADE")
+            db.session.commit()
+            print("[OK] Migration done.")
+        except Exception as e:
+            db.session.rollback()
+            print(f"[ERROR] {e}")
+            import traceback
+            traceback.print_exc()
+            raise
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,31 @@
+"""
+Migration: composite index on user (assigned_to, role) for the assistant's member list
+(WHERE assigned_to = ? AND role = 'member') and assigned-member counts.
+
+Run once: python migrate_user_assigned_role_index.py
+Check with: EXPLAIN SELECT * FROM "user" WHERE assigned_to = 1 AND role = 'member';
+"""
+
+from app import app, db
+from sqlalchemy import text
+
+
+def migrate():
+    with app.app_context():
+        try:
+            db.session.execute(text(
+                'CREATE INDEX IF NOT EXISTS idx_user_assigned_to_role ON "user" (assigned_to, role)'
+            ))
+            db.session.commit()
+            print("[OK] idx_user_assigned_to_role")
+            print("[OK] Migration done.")
+        except Exception as e:
+            db.session.rollback()
+            print(f"[ERROR] {e}")
+            import traceback
+            traceback.print_exc()
+            raise
+
+
+if __name__ == "__main__":
+    migrate()
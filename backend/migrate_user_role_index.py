@@ -0,0 +1,28 @@
+"""
+Migration: index user.role. Admin checks and the assistant/member lists filter by role.
+
+Run once: python migrate_user_role_index.py
+"""
+
+from app import app, db
+from sqlalchemy import text
+
+
+def migrate():
+    with app.app_context():
+        try:
+            # Same name SQLAlchemy generates for role = Column(..., index=True)
+            db.session.execute(text('CREATE INDEX IF NOT EXISTS ix_user_role ON "user" (role)'))
+            db.session.commit()
+            print("[OK] ix_user_role")
+            print("[OK] Migration done.")
+        except Exception as e:
+            db.session.rollback()
+            print(f"[ERROR] {e}")
+            import traceback
+            traceback.print_exc()
+            raise
+
+
+if __name__ == "__main__":
+    migrate()
@@ -7,6 +7,8 @@ from app import db
 from datetime import datetime
 import json
 
+from sqlalchemy.types import TypeDecorator
+
 # Exercise Categories
 EXERCISE_CATEGORY_BODYBUILDING_MACHINE = 'bodybuilding_machine'  # حرکات باشگاهی با دستگاه
 EXERCISE_CATEGORY_FUNCTIONAL_HOME = 'functional_home'  # حرکات فانکشنال / بدون وسیله
@@ -36,6 +38,27 @@ INTENSITY_HEAVY = 'heavy'
 # Do NOT import User from models
 
 
+class JSONList(TypeDecorator):
+    """TEXT column holding a JSON array, exposed as a Python list. Parsed once when the row is
+    loaded instead of on every getter call; NULL / empty / invalid text reads as []."""
+    impl = db.Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return json.dumps(value, ensure_ascii=False)
+
+    def process_result_value(self, value, dialect):
+        if not value:
+            return []
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return []
+        return parsed if isinstance(parsed, list) else []
+
+
 class UserProfile(db.Model):
     """User Profile with detailed fitness information"""
     __tablename__ = 'user_profiles'
@@ -60,20 +83,20 @@ class UserProfile(db.Model):
     
     # Training Information
     training_level = db.Column(db.String(20))  # 'beginner', 'intermediate', 'advanced'
-    fitness_goals = db.Column(db.Text)  # JSON array: ["weight_loss", "muscle_gain", "endurance", etc.]
+    fitness_goals = db.Column(JSONList)  # JSON array: ["weight_loss", "muscle_gain", "endurance", etc.]
     
     # Health Information
-    injuries = db.Column(db.Text)  # JSON array: ["knee", "shoulder", "lower_back", etc.]
+    injuries = db.Column(JSONList)  # JSON array: ["knee", "shoulder", "lower_back", etc.]
     injury_details = db.Column(db.Text)  # Detailed description of injuries
-    medical_conditions = db.Column(db.Text)  # JSON array: ["heart_disease", "high_blood_pressure", "pregnancy", etc.]
+    medical_conditions = db.Column(JSONList)  # JSON array: ["heart_disease", "high_blood_pressure", "pregnancy", etc.]
     medical_condition_details = db.Column(db.Text)  # Detailed description of medical conditions
     exercise_history_years = db.Column(db.Integer)  # Years of exercise experience
     exercise_history_description = db.Column(db.Text)  # Description of exercise history
     
     # Equipment Access
-    equipment_access = db.Column(db.Text)  # JSON array: ["machine", "dumbbells", "barbell", "home", etc.]
+    equipment_access = db.Column(JSONList)  # JSON array: ["machine", "dumbbells", "barbell", "home", etc.]
     gym_access = db.Column(db.Boolean, default=False)
-    home_equipment = db.Column(db.Text)  # JSON array of available home equipment
+    home_equipment = db.Column(JSONList)  # JSON array of available home equipment
     
     # Preferences
     preferred_workout_time = db.Column(db.String(20))  # 'morning', 'afternoon', 'evening'
@@ -94,75 +117,90 @@ class UserProfile(db.Model):
     # Metadata
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    user = db.relationship('User', back_populates='profile', lazy='raise')
+    
     def get_fitness_goals(self):
-        """Parse fitness_goals JSON string to list"""
-        if self.fitness_goals:
-            try:
-                return json.loads(self.fitness_goals)
-            except:
-                return []
-        return []
+        """fitness_goals as a list (already parsed by the JSONList column)"""
+        return self.fitness_goals or []
     
     def set_fitness_goals(self, goals_list):
-        """Set fitness_goals from list to JSON string"""
-        self.fitness_goals = json.dumps(goals_list, ensure_ascii=False)
+        """Set fitness_goals from a list (serialized by the JSONList column on flush)"""
+        self.fitness_goals = goals_list or []
     
     def get_injuries(self):
-        """Parse injuries JSON string to list"""
-        if self.injuries:
-            try:
-                return json.loads(self.injuries)
-            except:
-                return []
-        return []
+        """injuries as a list (already parsed by the JSONList column)"""
+        return self.injuries or []
     
     def set_injuries(self, injuries_list):
-        """Set injuries from list to JSON string"""
-        self.injuries = json.dumps(injuries_list, ensure_ascii=False)
+        """Set injuries from a list (serialized by the JSONList column on flush)"""
+        self.injuries = injuries_list or []
     
     def get_equipment_access(self):
-        """Parse equipment_access JSON string to list"""
-        if self.equipment_access:
-            try:
-                return json.loads(self.equipment_access)
-            except:
-                return []
-        return []
+        """equipment_access as a list (already parsed by the JSONList column)"""
+        return self.equipment_access or []
     
     def set_equipment_access(self, equipment_list):
-        """Set equipment_access from list to JSON string"""
-        self.equipment_access = json.dumps(equipment_list, ensure_ascii=False)
+        """Set equipment_access from a list (serialized by the JSONList column on flush)"""
+        self.equipment_access = equipment_list or []
     
     def get_home_equipment(self):
-        """Parse home_equipment JSON string to list"""
-        if self.home_equipment:
-            try:
-                return json.loads(self.home_equipment)
-            except:
-                return []
-        return []
+        """home_equipment as a list (already parsed by the JSONList column)"""
+        return self.home_equipment or []
     
     def set_home_equipment(self, equipment_list):
-        """Set home_equipment from list to JSON string"""
-        self.home_equipment = json.dumps(equipment_list, ensure_ascii=False)
+        """Set home_equipment from a list (serialized by the JSONList column on flush)"""
+        self.home_equipment = equipment_list or []
     
     def get_medical_conditions(self):
-        """Parse medical_conditions JSON string to list"""
-        if self.medical_conditions:
-            try:
-                return json.loads(self.medical_conditions)
-            except:
-                return []
-        return []
+        """medical_conditions as a list (already parsed by the JSONList column)"""
+        return self.medical_conditions or []
     
     def set_medical_conditions(self, conditions_list):
-        """Set medical_conditions from list to JSON string"""
-        self.medical_conditions = json.dumps(conditions_list, ensure_ascii=False)
+        """Set medical_conditions from a list (serialized by the JSONList column on flush)"""
+        self.medical_conditions = conditions_list or []
+    
+    def to_dict(self):
+        """Member-facing profile (GET /api/user/profile): text fields default to '', list fields to []."""
+        return {
+            'age': self.age,
+            'weight': self.weight,
+            'height': self.height,
+            'gender': self.gender or '',
+            'account_type': self.account_type or '',
+            'training_level': self.training_level or '',
+            'fitness_goals': self.get_fitness_goals(),
+            'injuries': self.get_injuries(),
+            'injury_details': self.injury_details or '',
+            'medical_conditions': self.get_medical_conditions(),
+            'medical_condition_details': self.medical_condition_details or '',
+            'exercise_history_years': self.exercise_history_years,
+            'exercise_history_description': self.exercise_history_description or '',
+            'chest_circumference': self.chest_circumference,
+            'waist_circumference': self.waist_circumference,
+            'abdomen_circumference': self.abdomen_circumference,
+            'arm_circumference': self.arm_circumference,
+            'hip_circumference': self.hip_circumference,
+            'thigh_circumference': self.thigh_circumference,
+            'equipment_access': self.get_equipment_access(),
+            'gym_access': bool(self.gym_access),
+            'home_equipment': self.get_home_equipment(),
+            'preferred_workout_time': self.preferred_workout_time or '',
+            'workout_days_per_week': self.workout_days_per_week,
+            'preferred_intensity': self.preferred_intensity or '',
+            'profile_image': self.profile_image or None,
+        }
 
 
 class Exercise(db.Model):
     """Exercise Library - Comprehensive exercise database with Persian/English support"""
     __tablename__ = 'exercises'
+    __table_args__ = (
+        # Admin/library list filters: category, category+level, level; the (col, id) pairs
+        # also serve keyset pagination (WHERE col = ? AND id > ? ORDER BY id)
+        db.Index('idx_exercises_category_level', 'category', 'level'),
+        db.Index('idx_exercises_category_id', 'category', 'id'),
+        db.Index('idx_exercises_level_id', 'level', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     
@@ -233,38 +271,66 @@ class Exercise(db.Model):
     
     def to_dict(self, language='fa'):
         """Convert exercise to dictionary based on language"""
+        fa = language == 'fa'
         return {
             'id': self.id,
             'category': self.category,
-            'name': self.name_fa if language == 'fa' else self.name_en,
+            'name': self.name_fa if fa else self.name_en,
             'name_fa': self.name_fa,
             'name_en': self.name_en,
-            'target_muscle': self.target_muscle_fa if language == 'fa' else self.target_muscle_en,
+            'target_muscle': self.target_muscle_fa if fa else self.target_muscle_en,
             'target_muscle_fa': self.target_muscle_fa,
             'target_muscle_en': self.target_muscle_en,
             'level': self.level,
             'intensity': self.intensity,
-            'execution_tips': self.execution_tips_fa if language == 'fa' else self.execution_tips_en,
+            'execution_tips': self.execution_tips_fa if fa else self.execution_tips_en,
             'execution_tips_fa': self.execution_tips_fa,
             'execution_tips_en': self.execution_tips_en,
-            'breathing_guide': self.breathing_guide_fa if language == 'fa' else self.breathing_guide_en,
+            'breathing_guide': self.breathing_guide_fa if fa else self.breathing_guide_en,
             'breathing_guide_fa': self.breathing_guide_fa,
             'breathing_guide_en': self.breathing_guide_en,
             'gender_suitability': self.gender_suitability,
             'injury_contraindications': self.get_injury_contraindications(),
-            'equipment_needed': self.equipment_needed_fa if language == 'fa' else self.equipment_needed_en,
+            'equipment_needed': self.equipment_needed_fa if fa else self.equipment_needed_en,
             'equipment_needed_fa': self.equipment_needed_fa,
             'equipment_needed_en': self.equipment_needed_en,
             'video_url': self.video_url,
             'image_url': self.image_url,
             'voice_url': self.voice_url or '',
-            'trainer_notes': self.trainer_notes_fa if language == 'fa' else self.trainer_notes_en,
+            'trainer_notes': self.trainer_notes_fa if fa else self.trainer_notes_en,
             'trainer_notes_fa': self.trainer_notes_fa or '',
             'trainer_notes_en': self.trainer_notes_en or '',
             'note_notify_at_seconds': self.note_notify_at_seconds,
             'ask_post_set_questions': getattr(self, 'ask_post_set_questions', False),
         }
 
+    # Columns read by to_summary_dict; list queries can load_only() these
+    SUMMARY_COLUMNS = ('id', 'category', 'name_fa', 'name_en', 'target_muscle_fa', 'target_muscle_en',
+                       'level', 'intensity', 'gender_suitability')
+
+    def to_summary_dict(self, language='fa'):
+        """Compact dictionary for list views. Only SUMMARY_COLUMNS are read, by plain attribute
+        access, so it also accepts a result row selected with just those columns."""
+        fa = language == 'fa'
+        return {
+            'id': self.id,
+            'category': self.category,
+            'name': self.name_fa if fa else self.name_en,
+            'name_fa': self.name_fa,
+            'name_en': self.name_en,
+            'target_muscle': self.target_muscle_fa if fa else self.target_muscle_en,
+            'target_muscle_fa': self.target_muscle_fa,
+            'target_muscle_en': self.target_muscle_en,
+            'level': self.level,
+            'intensity': self.intensity,
+            'gender_suitability': self.gender_suitability,
+        }
+
+
+# Member /exercise-info: case-insensitive lookup by name (WHERE lower(name_xx) = ?)
+db.Index('idx_exercises_name_fa_lower', db.func.lower(Exercise.name_fa))
+db.Index('idx_exercises_name_en_lower', db.func.lower(Exercise.name_en))
+
 
 class ExerciseHistory(db.Model):
     """Exercise History - tracks user's completed exercises"""
@@ -444,7 +510,7 @@ class MemberWeeklyGoal(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    training_program_id = db.Column(db.Integer, db.ForeignKey('training_programs.id'), nullable=False)
+    training_program_id = db.Column(db.Integer, db.ForeignKey('training_programs.id', ondelete='CASCADE'), nullable=False)
     week_number = db.Column(db.Integer, nullable=False)  # 1..duration_weeks
     
     goal_title_fa = db.Column(db.String(200))
@@ -458,6 +524,9 @@ class MemberWeeklyGoal(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Must be loaded explicitly (selectinload/joinedload); lazy access raises instead of a hidden per-row SELECT
+    program = db.relationship('TrainingProgram', lazy='raise')
+    
     __table_args__ = (
         db.UniqueConstraint('user_id', 'training_program_id', 'week_number', name='uq_member_program_week'),
     )
@@ -497,6 +566,8 @@ class BreakRequest(db.Model):
     
     __table_args__ = (
         db.Index('idx_break_requests_status', 'status'),
+        # Member's own list: WHERE user_id = ? ORDER BY created_at DESC LIMIT 50, no sort
+        db.Index('idx_break_requests_user_created', 'user_id', created_at.desc()),
     )
 
 
@@ -506,7 +577,7 @@ class MemberTrainingActionCompletion(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    training_program_id = db.Column(db.Integer, db.ForeignKey('training_programs.id'), nullable=False)
+    training_program_id = db.Column(db.Integer, db.ForeignKey('training_programs.id', ondelete='CASCADE'), nullable=False)
     session_index = db.Column(db.Integer, nullable=False)  # 0-based index in program.sessions
     exercise_index = db.Column(db.Integer, nullable=False)  # 0-based index in session.exercises
     completed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -535,7 +606,22 @@ class Notification(db.Model):
     read_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    __table_args__ = (db.Index('idx_notifications_user_read', 'user_id', 'read_at'),)
+    __table_args__ = (
+        db.Index('idx_notifications_user_read', 'user_id', 'read_at'),
+        # Listing: WHERE user_id = ? ORDER BY created_at DESC LIMIT n is an index range scan, no sort
+        db.Index('idx_notifications_user_created', 'user_id', created_at.desc()),
+        # Same, restricted to unread rows (unread_only listing, mark-all-read)
+        db.Index(
+            'idx_notifications_user_unread_created', 'user_id', created_at.desc(),
+            postgresql_where=read_at.is_(None), sqlite_where=read_at.is_(None),
+        ),
+        # At most one trial_ended notification per user: ensure_trial_ended_notifications inserts with
+        # WHERE NOT EXISTS and treats a violation here (concurrent run) as IntegrityError -> nothing created
+        db.Index(
+            'idx_notifications_user_trial_ended', 'user_id', unique=True,
+            postgresql_where=type == 'trial_ended', sqlite_where=type == 'trial_ended',
+        ),
+    )
 
 
 class TrainingActionNote(db.Model):
@@ -543,7 +629,7 @@ class TrainingActionNote(db.Model):
     __tablename__ = 'training_action_notes'
     
     id = db.Column(db.Integer, primary_key=True)
-    training_program_id = db.Column(db.Integer, db.ForeignKey('training_programs.id'), nullable=False)
+    training_program_id = db.Column(db.Integer, db.ForeignKey('training_programs.id', ondelete='CASCADE'), nullable=False)
     session_index = db.Column(db.Integer, nullable=False)
     exercise_index = db.Column(db.Integer, nullable=False)
     note_fa = db.Column(db.Text)
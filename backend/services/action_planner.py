@@ -143,9 +143,9 @@ def _build_user_profile_summary(user: User) -> str:
     if profile.gym_access is not None:
         parts.append(f"gym_access={profile.gym_access}")
     if profile.equipment_access:
-        parts.append(f"equipment_access={profile.equipment_access}")
+        parts.append(f"equipment_access={','.join(profile.equipment_access)}")
     if profile.home_equipment:
-        parts.append(f"home_equipment={profile.home_equipment}")
+        parts.append(f"home_equipment={','.join(profile.home_equipment)}")
     return "; ".join(parts) if parts else "No profile details; assume beginner, gym_access=true."
 
 
@@ -1005,7 +1005,7 @@ def _exec_update_user_profile(params: Dict[str, Any], user: User, language: str)
             continue
         if key in ('fitness_goals', 'injuries', 'equipment_access', 'medical_conditions', 'home_equipment'):
             if isinstance(value, list):
-                setattr(profile, key, json.dumps(value, ensure_ascii=False))
+                setattr(profile, key, value)
                 updated[key] = value
         else:
             setattr(profile, key, value)
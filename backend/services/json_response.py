@@ -0,0 +1,140 @@
+"""
+Fast JSON responses. Uses orjson when installed (native datetime support, always UTF-8),
+otherwise falls back to Flask's configured JSON provider. With orjson, app.py also installs
+ORJSONProvider as the app's JSON provider.
+"""
+
+import hashlib
+import json
+from datetime import date
+from functools import wraps
+
+from flask import current_app, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+    HAS_ORJSON = False
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if HAS_ORJSON else 0
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """App JSON provider backed by orjson, so plain jsonify() and request.get_json() take the fast
+    path too. Dates/datetimes come out as ISO 8601; other types orjson does not know go through
+    Flask's default hook (Decimal, UUID, dataclasses)."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=_ORJSON_OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=_ORJSON_OPTIONS), mimetype=self.mimetype
+        )
+
+
+def _default(value):
+    """Fallback encoder hook: dates/datetimes as ISO 8601 like orjson (Flask's default is RFC 822)."""
+    if isinstance(value, date):
+        return value.isoformat()
+    return current_app.json.default(value)
+
+
+def dumps_bytes(payload) -> bytes:
+    """Serialize payload to UTF-8 JSON bytes. date/datetime values are written as ISO 8601,
+    so views can pass them through instead of calling isoformat() per row."""
+    if HAS_ORJSON:
+        return orjson.dumps(payload, option=_ORJSON_OPTIONS)
+    return current_app.json.dumps(payload, default=_default).encode('utf-8')
+
+
+def dumps_text(value) -> str:
+    """Serialize value to a JSON string for Text columns (UTF-8, no ASCII escaping)."""
+    if HAS_ORJSON:
+        return orjson.dumps(value, option=_ORJSON_OPTIONS).decode('utf-8')
+    return json.dumps(value, ensure_ascii=False)
+
+
+def json_loads(text):
+    """Parse a JSON string/bytes (stored Text columns, request bodies)."""
+    if HAS_ORJSON:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def json_response(payload, status=200):
+    """Drop-in for `jsonify(payload), status` on hot list endpoints."""
+    return current_app.response_class(dumps_bytes(payload), status=status, mimetype='application/json')
+
+
+def static_json_response(payload, status=200):
+    """Constant reply (fixed error / ack): the body is encoded once, here, and the returned
+    callable wraps those bytes in a fresh response per request. A shared Response object is not
+    reusable, since after_request hooks (CORS) mutate its headers."""
+    if HAS_ORJSON:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def respond():
+        return current_app.response_class(body, status=status, mimetype='application/json')
+
+    return respond
+
+
+_EMPTY = object()
+
+
+def _stream(head, items, tail, status):
+    # Pull the first item before the response exists: a lazy query (yield_per) executes here, so a
+    # DB error raises inside the calling view's try/except (500) instead of truncating a 200 body
+    items = iter(items)
+    first = next(items, _EMPTY)
+
+    def generate():
+        yield head
+        if first is not _EMPTY:
+            yield dumps_bytes(first)
+            for item in items:
+                yield b',' + dumps_bytes(item)
+        yield tail
+
+    return current_app.response_class(stream_with_context(generate()), status=status, mimetype='application/json')
+
+
+def stream_json_list(key, items, status=200):
+    """Stream `{"<key>": [item, ...]}` one item at a time instead of building the list in memory.
+    The first item is read before returning (query errors surface in the view); the rest are read
+    by the generator inside the request context, so lazy DB iteration (yield_per) keeps working."""
+    return _stream(b'{' + dumps_bytes(key) + b':[', items, b']}', status)
+
+
+def stream_json_array(items, status=200):
+    """Like stream_json_list, for endpoints whose body is a bare `[item, ...]` array."""
+    return _stream(b'[', items, b']', status)
+
+
+def etag_response(max_age=0):
+    """Tag a JSON GET view's 200 response with a BLAKE2b ETag and answer a matching
+    If-None-Match with 304 (no body). max_age=0 means clients revalidate on every request,
+    so admins never see a stale list after their own writes; the 304 still skips the transfer.
+    Responses vary on Authorization because the payload depends on the signed-in user."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            response = current_app.make_response(fn(*args, **kwargs))
+            if request.method != 'GET' or response.status_code != 200 or response.is_streamed:
+                return response
+            response.set_etag(hashlib.blake2b(response.get_data(), digest_size=16).hexdigest())
+            response.headers['Cache-Control'] = f'private, max-age={max_age}' if max_age else 'private, no-cache'
+            response.vary.add('Authorization')
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
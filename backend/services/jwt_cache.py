@@ -0,0 +1,39 @@
+"""
+JWTManager whose token decoding is cached per process. Every @jwt_required() request re-verifies
+the same bearer token (HS256 signature + claim checks) for its whole 24 h lifetime; successfully
+decoded claims are kept in a TTLCache keyed by a BLAKE2b digest of the token, for at most
+JWT_DECODE_CACHE_TTL seconds and never past the token's own exp. Invalid or expired tokens are
+never cached, so they keep failing through flask_jwt_extended's normal error handlers.
+"""
+
+import hashlib
+import time
+
+from flask_jwt_extended import JWTManager
+
+from services.ttl_cache import TTLCache
+
+JWT_DECODE_CACHE_TTL = 300
+
+_decoded = TTLCache(maxsize=10000, ttl=JWT_DECODE_CACHE_TTL)
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that reuses the decoded claims of recently verified tokens."""
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        # CSRF double-submit and allow_expired decodes must always run the full verification
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        raw = encoded_token.encode('utf-8') if isinstance(encoded_token, str) else encoded_token
+        key = hashlib.blake2b(raw, digest_size=16).digest()
+        claims = _decoded.get(key)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+            ttl = JWT_DECODE_CACHE_TTL
+            if 'exp' in claims:
+                ttl = min(ttl, claims['exp'] - time.time())
+            if ttl > 0:
+                _decoded.set(key, claims, ttl=ttl)
+        # Callers keep the claims on g; hand out a copy so the cached dict is never mutated
+        return dict(claims)
@@ -0,0 +1,91 @@
+"""
+Password hashing with an explicit, configurable work factor.
+Werkzeug's default (pbkdf2:sha256 with 600k+ iterations) costs hundreds of ms of CPU per hash
+on the request thread. New hashes use bcrypt (BCRYPT_ROUNDS, default 10) when the bcrypt package
+is installed, else PASSWORD_HASH_METHOD; PASSWORD_HASH_METHOD=bcrypt or a werkzeug method string
+pins the scheme explicitly. Existing hashes keep verifying because each stored hash records the
+method it was created with, and login rehashes them to the current scheme (needs_rehash).
+"""
+
+import hashlib
+import hmac
+import os
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from services.ttl_cache import TTLCache
+
+try:
+    import bcrypt
+    HAS_BCRYPT = True
+except ImportError:  # pragma: no cover - optional dependency
+    bcrypt = None
+    HAS_BCRYPT = False
+
+WERKZEUG_HASH_METHOD = 'pbkdf2:sha256:100000'
+PASSWORD_HASH_METHOD = (
+    os.getenv('PASSWORD_HASH_METHOD', '').strip() or ('bcrypt' if HAS_BCRYPT else WERKZEUG_HASH_METHOD)
+)
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '10'))
+# bcrypt only uses the first 72 bytes of a password; longer ones get the werkzeug method instead
+_BCRYPT_MAX_BYTES = 72
+
+# Successful verifications, so an app that logs in again with the same credentials skips the KDF.
+# Keys are HMACs under a per-process random key (no raw or plainly hashed passwords are kept) and
+# include the stored hash, so any password change makes the old entry unreachable. Failures are
+# never cached.
+VERIFY_CACHE_TTL = 60
+_verified = TTLCache(maxsize=2048, ttl=VERIFY_CACHE_TTL)
+_verify_key = os.urandom(32)
+
+
+def _method_for(password):
+    """The scheme hash_password uses for this password: 'bcrypt' or a werkzeug method string."""
+    if PASSWORD_HASH_METHOD != 'bcrypt':
+        return PASSWORD_HASH_METHOD
+    if not HAS_BCRYPT or len(password.encode('utf-8')) > _BCRYPT_MAX_BYTES:
+        return WERKZEUG_HASH_METHOD
+    return 'bcrypt'
+
+
+def hash_password(password):
+    """Hash a password with the configured scheme."""
+    method = _method_for(password)
+    if method == 'bcrypt':
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('ascii')
+    return generate_password_hash(password, method=method)
+
+
+def _check(password_hash, password):
+    if password_hash.startswith('$2'):
+        if not HAS_BCRYPT:
+            return False
+        try:
+            return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('ascii'))
+        except ValueError:
+            return False
+    return check_password_hash(password_hash, password)
+
+
+def needs_rehash(password_hash, password):
+    """True if password_hash was made with another scheme or work factor than hash_password uses now."""
+    method = _method_for(password)
+    if method == 'bcrypt':
+        # $2b$<rounds>$<salt+hash>
+        parts = password_hash.split('$')
+        return not password_hash.startswith('$2') or len(parts) < 3 or parts[2] != f'{BCRYPT_ROUNDS:02d}'
+    return password_hash.split('$', 1)[0] != method
+
+
+def verify_password(user_id, password_hash, password):
+    """Check a password against its stored hash, with recent successful checks for the same
+    user/hash/password cached."""
+    key = hmac.new(
+        _verify_key, f'{user_id}\0{password_hash}\0{password}'.encode('utf-8'), hashlib.sha256
+    ).digest()
+    if _verified.get(key):
+        return True
+    if not _check(password_hash, password):
+        return False
+    _verified.set(key, True)
+    return True
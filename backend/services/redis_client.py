@@ -0,0 +1,37 @@
+"""
+Optional shared Redis connection (REDIS_URL). Returns None when Redis is not configured,
+the redis package is missing, or the server is unreachable, so callers fall back to
+in-process caches.
+"""
+
+import logging
+import os
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+    HAS_REDIS = False
+
+logger = logging.getLogger(__name__)
+
+_redis_client = None
+_redis_checked = False
+
+
+def get_redis():
+    """Return a connected Redis client or None (checked once per process)."""
+    global _redis_client, _redis_checked
+    if _redis_checked:
+        return _redis_client
+    _redis_checked = True
+    url = os.getenv('REDIS_URL', '').strip()
+    if url and HAS_REDIS:
+        try:
+            client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            client.ping()
+            _redis_client = client
+        except Exception as e:
+            logger.warning("Redis unavailable (%s); using in-process caches", e)
+    return _redis_client
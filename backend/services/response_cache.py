@@ -0,0 +1,132 @@
+"""
+Response cache for read-heavy JSON GET endpoints.
+Uses Redis when REDIS_URL is set and the redis package is installed (shared across gunicorn
+workers); otherwise an in-process TTL cache. Each namespace has a version counter: writes call
+invalidate(namespace), which bumps the version so every cached entry of that namespace is skipped.
+Without Redis the versions are per process too, so an invalidate() only reaches the worker that
+handled the write: other workers keep serving their copy until it expires (at most LOCAL_MAX_TTL).
+Run with REDIS_URL, or a single worker, where that lag matters; a warning is logged on first use.
+The last good body is also kept for a longer window and served if the DB is unreachable.
+"""
+
+import logging
+import threading
+from functools import wraps
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.exc import DBAPIError
+
+from services.redis_client import get_redis as _get_redis
+from services.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Stale copies outlive fresh ones by this factor (served only when the view fails on the DB)
+STALE_TTL_FACTOR = 10
+# Cap on fresh entries kept in the in-process cache: without Redis an invalidate() only reaches the
+# worker that handled the write, so other workers may serve the old body for up to this long
+LOCAL_MAX_TTL = 30
+
+_local_cache = TTLCache(maxsize=512, ttl=30)
+_local_versions = {}
+_versions_lock = threading.Lock()
+_local_warned = False
+
+
+def _warn_if_process_local():
+    """Log once per process when the cache (and its invalidation) is not shared across workers."""
+    global _local_warned
+    if _local_warned:
+        return
+    _local_warned = True
+    if _get_redis() is None:
+        logger.warning(
+            "Response cache: REDIS_URL not set or unreachable; using an in-process cache. "
+            "Invalidation does not reach other workers, which may serve responses up to %ss old.",
+            LOCAL_MAX_TTL,
+        )
+
+
+def _version(namespace):
+    client = _get_redis()
+    if client is not None:
+        try:
+            return int(client.get(f'rc:ver:{namespace}') or 0)
+        except Exception:
+            pass
+    return _local_versions.get(namespace, 0)
+
+
+def invalidate(*namespaces):
+    """Drop all cached responses of the given namespaces (call after writes)."""
+    client = _get_redis()
+    for ns in namespaces:
+        with _versions_lock:
+            _local_versions[ns] = _local_versions.get(ns, 0) + 1
+        if client is not None:
+            try:
+                client.incr(f'rc:ver:{ns}')
+            except Exception as e:
+                logger.warning("Response cache: invalidate %s failed: %s", ns, e)
+
+
+def _get(key):
+    client = _get_redis()
+    if client is not None:
+        try:
+            item = client.hgetall(key)
+            if item:
+                return int(item[b'status']), item[b'body']
+            return None
+        except Exception:
+            pass
+    return _local_cache.get(key)
+
+
+def _set(key, status, body, ttl, local_ttl=None):
+    client = _get_redis()
+    if client is not None:
+        try:
+            pipe = client.pipeline()
+            pipe.hset(key, mapping={'status': status, 'body': body})
+            pipe.expire(key, ttl)
+            pipe.execute()
+            return
+        except Exception:
+            pass
+    _local_cache.set(key, (status, body), local_ttl or ttl)
+
+
+def cached_response(namespace, ttl=30, per_user=True):
+    """Cache a JSON GET view's body per namespace version, query string and (optionally) user.
+    ttl applies in Redis; the in-process fallback keeps entries at most LOCAL_MAX_TTL seconds.
+    Place it below the auth decorator so only authorized requests reach the cache."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            _warn_if_process_local()
+            user_part = str(get_jwt_identity()) if per_user else '-'
+            query = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+            base = f'rc:{namespace}:{user_part}:{request.path}?{query}'
+            key = f'{base}:v{_version(namespace)}'
+            hit = _get(key)
+            if hit is not None:
+                status, body = hit
+                return current_app.response_class(body, status=status, mimetype='application/json')
+            try:
+                response = current_app.make_response(fn(*args, **kwargs))
+            except DBAPIError:
+                stale = _get(f'{base}:stale')
+                if stale is None:
+                    raise
+                logger.warning("Response cache: DB error, serving stale %s", base)
+                status, body = stale
+                return current_app.response_class(body, status=status, mimetype='application/json')
+            if response.status_code == 200 and not response.is_streamed:
+                body = response.get_data()
+                _set(key, 200, body, ttl, local_ttl=min(ttl, LOCAL_MAX_TTL))
+                _set(f'{base}:stale', 200, body, ttl * STALE_TTL_FACTOR)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,72 @@
+"""
+user_id -> role cache shared by the auth checks. Backed by Redis (key user_role:{id}) when
+REDIS_URL is configured so all workers see the same entry, with an in-process TTL cache in
+front / as fallback. Entries are short-lived; role changes and deletions overwrite the entry
+through set_cached_role() ('' for a deleted user), so the cache answers before any token claim.
+"""
+
+import time
+
+from flask_jwt_extended import get_jwt
+from sqlalchemy import select
+
+from services.redis_client import get_redis
+from services.ttl_cache import TTLCache
+
+ROLE_TTL = 60
+
+# '' marks a user id that does not exist
+_local = TTLCache(maxsize=1024, ttl=ROLE_TTL)
+
+
+def get_cached_role(user_id):
+    """Return the cached role ('' for a missing user) or None on a cache miss."""
+    role = _local.get(user_id)
+    if role is not None:
+        return role
+    client = get_redis()
+    if client is not None:
+        try:
+            value = client.get(f'user_role:{user_id}')
+        except Exception:
+            value = None
+        if value is not None:
+            role = value.decode()
+            _local.set(user_id, role)
+            return role
+    return None
+
+
+def set_cached_role(user_id, role):
+    role = role or ''
+    _local.set(user_id, role)
+    client = get_redis()
+    if client is not None:
+        try:
+            client.set(f'user_role:{user_id}', role, ex=ROLE_TTL)
+        except Exception:
+            pass
+
+
+def lookup_role(user_id):
+    """Role of user_id ('' if the user does not exist), without loading the User row: this cache
+    first (so deletions and role changes win), else the 'role' claim of an access token issued less
+    than ROLE_TTL seconds ago (the claim is only a hint, as old as the login), else a
+    single-column SELECT whose result is cached."""
+    role = get_cached_role(user_id)
+    if role is not None:
+        return role
+    try:
+        claims = get_jwt()
+    except RuntimeError:
+        claims = {}
+    if (
+        'role' in claims
+        and claims.get('sub') == str(user_id)
+        and time.time() - claims.get('iat', 0) < ROLE_TTL
+    ):
+        return claims['role'] or ''
+    from app import User, db
+    role = db.session.execute(select(User.role).where(User.id == user_id)).scalar() or ''
+    set_cached_role(user_id, role)
+    return role
@@ -4,8 +4,17 @@ Uses the admin-configured AI provider (OpenAI, Anthropic, or Gemini) via service
 """
 
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 from typing import Dict, Any, List, Optional, Tuple
 
+# Short in-session replies (session-end message, post-set feedback) have a built-in fallback text, so
+# the request only waits this long for the provider; the call itself finishes on a small shared pool.
+AI_QUICK_REPLY_TIMEOUT = float(os.getenv('AI_QUICK_REPLY_TIMEOUT', '10'))
+_quick_reply_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv('AI_QUICK_REPLY_WORKERS', '8')), thread_name_prefix='ai-quick-reply'
+)
+
 
 def _ai_chat(system: str, user: str, max_tokens: int = 800, db=None) -> Optional[str]:
     """Call the configured AI provider (from admin AI settings). Returns None if unavailable.
@@ -20,15 +29,31 @@ def _ai_chat(system: str, user: str, max_tokens: int = 800, db=None) -> Optional
     return None
 
 
+def _ai_chat_quick(system: str, user: str, max_tokens: int = 800) -> Optional[str]:
+    """_ai_chat with a deadline: returns None (the caller's fallback text) when the provider takes
+    longer than AI_QUICK_REPLY_TIMEOUT, so a slow provider no longer holds the request worker."""
+    from flask import current_app
+    app = current_app._get_current_object()
+
+    def call():
+        with app.app_context():
+            return _ai_chat(system, user, max_tokens=max_tokens)
+
+    future = _quick_reply_pool.submit(call)
+    try:
+        return future.result(timeout=AI_QUICK_REPLY_TIMEOUT)
+    except FuturesTimeout:
+        print(f"session_ai_service: AI reply slower than {AI_QUICK_REPLY_TIMEOUT}s, using fallback")
+        return None
+
+
 def _inject_session_phases(session: Dict[str, Any], db) -> None:
     """Inject warming and cooldown from admin session_phases into the session (for template fallback only)."""
     try:
-        from models import SiteSettings
-        row = db.session.query(SiteSettings).first()
-        raw = (getattr(row, 'session_phases_json', None) or '').strip() if row else ''
-        if not raw:
+        from services.session_phases import load_session_phases
+        data = load_session_phases(db)
+        if not isinstance(data, dict):
             return
-        data = json.loads(raw)
         if data.get('warming'):
             session['warming'] = data['warming']
         if data.get('cooldown'):
@@ -278,7 +303,7 @@ def get_session_end_encouragement(language: str = 'fa', session_name: str = '')
     system_fa = "تو یک مربی انگیزشی هستی. یک پیام کوتاه و تشویق‌کننده (۲ تا ۳ جمله) به فارسی برای ورزشکاری که جلسه تمرینش را تمام کرده بنویس. از اموجی مناسب استفاده کن."
     system_en = "You are a motivational coach. Write a short encouraging message (2-3 sentences) in English for a member who just finished their workout session. Use appropriate emojis."
     user = f"Session: {session_name}" if session_name else ""
-    out = _ai_chat(system_fa if lang_fa else system_en, user or 'Workout completed.')
+    out = _ai_chat_quick(system_fa if lang_fa else system_en, user or 'Workout completed.')
     if out:
         return out
     if lang_fa:
@@ -306,7 +331,7 @@ def get_post_set_feedback(
 Based on answers: if correct, encourage; if they got the target muscle wrong or form tip wrong, gently correct and give a short tip.
 Output: only one short paragraph (2-4 sentences) in English. No title."""
     user = f"Exercise: {exercise_name_fa} / {exercise_name_en}. Target muscle: {target_muscle}. Answers: {answers_str}"
-    out = _ai_chat(system_fa if lang_fa else system_en, user)
+    out = _ai_chat_quick(system_fa if lang_fa else system_en, user)
     if out:
         return out
     if lang_fa:
@@ -0,0 +1,37 @@
+"""
+Parsed SiteSettings.session_phases_json (warming, cooldown, ending message), cached per process.
+The settings row's updated_at is the invalidation token: a read fetches only (id, updated_at) and the
+JSON text is loaded and parsed again only when that token changes, i.e. after any settings save.
+"""
+
+from services.json_response import json_loads
+
+EMPTY_SESSION_PHASES = {
+    'warming': {'title_fa': '', 'title_en': '', 'steps': []},
+    'cooldown': {'title_fa': '', 'title_en': '', 'steps': []},
+    'ending_message_fa': '',
+    'ending_message_en': '',
+}
+
+# (token, parsed dict or None); replaced as a whole so concurrent readers never see a torn pair
+_cached = (None, None)
+
+
+def load_session_phases(db):
+    """Return the parsed session phases dict (shared, treat as read-only), or None when unset or invalid."""
+    global _cached
+    from models import SiteSettings
+    row = db.session.query(SiteSettings.id, SiteSettings.updated_at).first()
+    if not row:
+        return None
+    token = (row.id, row.updated_at)
+    cached_token, data = _cached
+    if token == cached_token:
+        return data
+    raw = (db.session.query(SiteSettings.session_phases_json).filter_by(id=row.id).scalar() or '').strip()
+    try:
+        data = json_loads(raw) if raw else None
+    except ValueError:
+        data = None
+    _cached = (token, data)
+    return data
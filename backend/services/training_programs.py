@@ -0,0 +1,21 @@
+"""
+Deleting training programs. On PostgreSQL the training_program_id foreign keys of weekly goals,
+action completions and action notes are ON DELETE CASCADE (migrate_training_program_cascade.py),
+so deleting the program removes them. Existing SQLite tables keep their non-cascading keys, so
+there the dependent rows are deleted explicitly first.
+"""
+
+from sqlalchemy import delete
+
+
+def delete_program_dependents(session, program_ids):
+    """Delete the goals, completions and notes of program_ids unless the database cascades.
+    Call before deleting the programs themselves."""
+    if not program_ids or session.get_bind().dialect.name == 'postgresql':
+        return
+    from models import MemberTrainingActionCompletion, MemberWeeklyGoal, TrainingActionNote
+    for model in (MemberWeeklyGoal, MemberTrainingActionCompletion, TrainingActionNote):
+        session.execute(
+            delete(model).where(model.training_program_id.in_(program_ids)),
+            execution_options={'synchronize_session': False},
+        )
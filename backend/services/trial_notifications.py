@@ -0,0 +1,90 @@
+"""
+Background job that sends the one-time 'trial_ended' notification, so GET /api/member/trial-status
+stays read-only. Each worker runs it every TRIAL_NOTIFICATION_INTERVAL seconds (default 300, 0 disables)
+in a daemon thread; the INSERT ... SELECT ... WHERE NOT EXISTS is idempotent, so overlapping runs are harmless.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import exists, insert, literal, select
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+TRIAL_ENDED_TITLE_FA = 'پایان دوره آزمایشی'
+TRIAL_ENDED_TITLE_EN = 'Free trial ended'
+TRIAL_ENDED_BODY_FA = 'دوره ۷ روزه رایگان شما به پایان رسید. برای ادامه استفاده از تمام امکانات تمرینی، اشتراک تهیه کنید.'
+TRIAL_ENDED_BODY_EN = 'Your 7-day free trial has ended. Subscribe to continue using all training features.'
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def ensure_trial_ended_notifications(db):
+    """Create the trial_ended notification for every user whose trial has ended and who has none yet,
+    in one statement. Returns the number of notifications created."""
+    from app import User
+    from models import Notification
+
+    now = datetime.utcnow()
+    already_sent = exists().where(Notification.user_id == User.id, Notification.type == 'trial_ended')
+    source = select(
+        User.id,
+        literal(TRIAL_ENDED_TITLE_FA),
+        literal(TRIAL_ENDED_TITLE_EN),
+        literal(TRIAL_ENDED_BODY_FA),
+        literal(TRIAL_ENDED_BODY_EN),
+        literal('trial_ended'),
+        literal('?tab=profile'),
+        literal(now),
+    ).where(User.trial_ends_at <= now, ~already_sent)
+    stmt = insert(Notification).from_select(
+        ['user_id', 'title_fa', 'title_en', 'body_fa', 'body_en', 'type', 'link', 'created_at'],
+        source,
+    )
+    try:
+        created = db.session.execute(stmt).rowcount
+        db.session.commit()
+    except IntegrityError:
+        # Another worker inserted the same rows first (unique idx_notifications_user_trial_ended)
+        db.session.rollback()
+        return 0
+    return created
+
+
+def start_trial_notification_job(app):
+    """Start the periodic job once per process (no-op on later calls or when disabled)."""
+    global _started
+    if _started:
+        return
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    try:
+        interval = int(os.getenv('TRIAL_NOTIFICATION_INTERVAL', '300') or 0)
+    except ValueError:
+        interval = 300
+    if interval <= 0:
+        return
+
+    def run():
+        while True:
+            with app.app_context():
+                db = app.extensions['sqlalchemy']
+                try:
+                    created = ensure_trial_ended_notifications(db)
+                    if created:
+                        logger.info("Trial notifications: created %s", created)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("Trial notifications job failed: %s", e)
+                finally:
+                    db.session.remove()
+            time.sleep(interval)
+
+    threading.Thread(target=run, name='trial-notifications', daemon=True).start()
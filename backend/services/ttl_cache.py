@@ -0,0 +1,51 @@
+"""
+Small in-process TTL cache used for hot, rarely-changing lookups (e.g. user roles).
+Thread-safe; entries expire after `ttl` seconds and the oldest entry is evicted at `maxsize`.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded dict-like cache whose entries expire after a fixed number of seconds."""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return cached value for key, or default if missing/expired."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            expires_at, value = item
+            if expires_at <= now:
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store value for key (optionally with its own ttl), evicting the oldest entry when full."""
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Remove key from the cache (used to invalidate after writes)."""
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+        return default if item is _MISSING else item[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,15 @@
+"""
+Dialect-aware INSERT for UPSERTs. PostgreSQL and SQLite (the two databases this app runs on)
+both support INSERT ... ON CONFLICT, but through separate SQLAlchemy insert constructs.
+"""
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+
+def upsert_insert(session, model):
+    """Return an insert(model) that supports on_conflict_do_update / on_conflict_do_nothing
+    for the database the session is bound to."""
+    if session.get_bind().dialect.name == 'postgresql':
+        return pg_insert(model)
+    return sqlite_insert(model)
@@ -0,0 +1,12 @@
+"""
+Input format checks shared by the auth, profile and admin endpoints, so they cannot drift apart.
+"""
+
+import re
+
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+
+def is_valid_email(value):
+    """True for a string that looks like an email address (local@domain.tld)."""
+    return isinstance(value, str) and EMAIL_RE.match(value) is not None
@@ -15,6 +15,9 @@ from typing import Any, Dict, List, Optional
 
 import requests
 from flask import current_app
+from sqlalchemy import func
+
+from services.ttl_cache import TTLCache
 
 try:
     from services import vector_store
@@ -27,6 +30,23 @@ except ImportError:
         vector_store = None
         HAS_VECTOR_STORE = False
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover - optional dependency (requirements-rag.txt)
+    np = None
+    HAS_NUMPY = False
+
+# get_kb_status() result per database URI; the admin UI polls it, and build_kb_index() drops it
+KB_STATUS_TTL = 5
+_status_cache = TTLCache(maxsize=8, ttl=KB_STATUS_TTL)
+
+# PostgreSQL path: chunks with their embeddings parsed and L2-normalized once, as
+# (token, ids, texts, vectors). token = (db uri, chunk count, newest updated_at), so any reindex
+# (in this worker or another) is picked up on the next query. vectors is a numpy matrix when
+# numpy is installed, else a list of unit vectors.
+_index_cache = (None, (), (), None)
+
 
 def _get_embedding_api_key() -> tuple:
     """Get Vertex or OpenAI API key from env or Admin AI Settings. Returns (key, provider)."""
@@ -343,6 +363,7 @@ def build_kb_index() -> Dict[str, Any]:
     if _use_sqlite_vec():
         uri = _get_db_uri()
         count, errors = vector_store.reindex_website_kb(uri, text)
+        _status_cache.pop(uri)
         if errors:
             raise RuntimeError("; ".join(errors[:3]))
         return {
@@ -367,6 +388,7 @@ def build_kb_index() -> Dict[str, Any]:
         )
         db.session.add(row)
     db.session.commit()
+    _status_cache.pop(_get_db_uri())
 
     return {
         'updated_at': datetime.utcnow().isoformat(),
@@ -394,15 +416,44 @@ def load_kb_chunks() -> List[Dict[str, Any]]:
     return result
 
 
-def _cosine_similarity(a: List[float], b: List[float]) -> float:
-    if not a or not b or len(a) != len(b):
-        return 0.0
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(y * y for y in b))
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (norm_a * norm_b)
+def _chunks_token(db):
+    """Cheap fingerprint of the WebsiteKBChunk table: (count, newest updated_at)."""
+    from models import WebsiteKBChunk
+    return tuple(db.session.query(
+        func.count(WebsiteKBChunk.id), func.max(WebsiteKBChunk.updated_at)
+    ).one())
+
+
+def _unit(vec: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vec))
+    return [x / norm for x in vec] if norm else vec
+
+
+def _load_index():
+    """Return (ids, texts, vectors) for the PostgreSQL path, rebuilding only after a reindex."""
+    global _index_cache
+    db = _get_db()
+    token = (_get_db_uri(),) + _chunks_token(db)
+    cached_token, ids, texts, vectors = _index_cache
+    if token == cached_token:
+        return ids, texts, vectors
+
+    chunks = load_kb_chunks()
+    ids = tuple(ch['id'] for ch in chunks)
+    texts = tuple(ch['text'] for ch in chunks)
+    if HAS_NUMPY:
+        # Chunks of another dimension (older provider) keep a zero row, i.e. score 0 as before
+        dim = next((len(ch['embedding']) for ch in chunks if ch['embedding']), 0)
+        vectors = np.zeros((len(chunks), dim), dtype=np.float32)
+        for i, ch in enumerate(chunks):
+            if dim and len(ch['embedding']) == dim:
+                vectors[i] = ch['embedding']
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    else:
+        vectors = [_unit(ch['embedding']) for ch in chunks]
+    _index_cache = (token, ids, texts, vectors)
+    return ids, texts, vectors
 
 
 def search_kb(query: str, top_k: int = 3) -> List[Dict[str, Any]]:
@@ -412,8 +463,8 @@ def search_kb(query: str, top_k: int = 3) -> List[Dict[str, Any]]:
         texts = vector_store.search_website_kb(uri, query, limit=max(1, min(top_k, 10)))
         return [{'score': 1.0, 'text': t, 'id': i + 1} for i, t in enumerate(texts)]
 
-    chunks = load_kb_chunks()
-    if not chunks:
+    ids, texts, vectors = _load_index()
+    if not ids:
         return []
 
     try:
@@ -421,34 +472,46 @@ def search_kb(query: str, top_k: int = 3) -> List[Dict[str, Any]]:
     except Exception:
         return []
 
-    scored = []
-    for ch in chunks:
-        score = _cosine_similarity(q_embed, ch.get('embedding') or [])
-        scored.append((score, ch))
-    scored.sort(key=lambda x: x[0], reverse=True)
-
-    return [
-        {'score': float(s), 'text': ch.get('text', ''), 'id': ch.get('id')}
-        for s, ch in scored[:max(1, min(top_k, 10))]
+    limit = max(1, min(top_k, 10))
+    if HAS_NUMPY:
+        # One matrix-vector product over the cached unit vectors; stable sort keeps chunk order on ties
+        q = np.asarray(q_embed, dtype=np.float32)
+        q_norm = np.linalg.norm(q) if q.ndim == 1 else 0
+        if q_norm and q.shape[0] == vectors.shape[1]:
+            scores = vectors @ (q / q_norm)
+        else:
+            scores = np.zeros(len(ids), dtype=np.float32)
+        order = np.argsort(-scores, kind='stable')[:limit]
+        return [{'score': float(scores[i]), 'text': texts[i], 'id': ids[i]} for i in order]
+
+    q_unit = _unit(q_embed)
+    scored = [
+        (sum(x * y for x, y in zip(q_unit, vec)) if len(vec) == len(q_unit) else 0.0, i)
+        for i, vec in enumerate(vectors)
     ]
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [{'score': float(score), 'text': texts[i], 'id': ids[i]} for score, i in scored[:limit]]
 
 
 def get_kb_status() -> Dict[str, Any]:
-    """Return KB status (count, updated_at)."""
+    """Return KB status (count, updated_at), cached for KB_STATUS_TTL seconds."""
+    uri = _get_db_uri()
+    status = _status_cache.get(uri)
+    if status is not None:
+        return status
+
     if _use_sqlite_vec():
-        uri = _get_db_uri()
         count = vector_store.get_website_kb_count(uri)
-        return {
+        status = {
             'count': count,
             'updated_at': datetime.utcnow().isoformat() if count else None,
         }
-
-    db = _get_db()
-    from models import WebsiteKBChunk
-
-    count = db.session.query(WebsiteKBChunk).count()
-    last = db.session.query(WebsiteKBChunk).order_by(WebsiteKBChunk.updated_at.desc()).first()
-    return {
-        'count': count,
-        'updated_at': last.updated_at.isoformat() if last and last.updated_at else None,
-    }
+    else:
+        # One aggregate row instead of COUNT(*) plus loading the newest chunk (with its embedding)
+        count, updated_at = _chunks_token(_get_db())
+        status = {
+            'count': count,
+            'updated_at': updated_at.isoformat() if updated_at else None,
+        }
+    _status_cache.set(uri, status)
+    return status
@@ -2,5 +2,13 @@
 set -e
 
 PORT="${BACKEND_PORT:-8000}"
+WORKER_CLASS="${GUNICORN_WORKER_CLASS:-gthread}"
+WORKERS="${GUNICORN_WORKERS:-2}"
 
-exec gunicorn --workers 2 --threads 4 --timeout 120 --bind "0.0.0.0:${PORT}" app:app
+if [ "$WORKER_CLASS" = "gevent" ]; then
+  # Cooperative workers: DB/AI-provider waits yield to other requests instead of holding a thread
+  exec gunicorn --worker-class gevent --workers "$WORKERS" --worker-connections "${GUNICORN_WORKER_CONNECTIONS:-100}" --timeout 120 --bind "0.0.0.0:${PORT}" app:app
+fi
+
+# Handlers are I/O-bound (DB, AI providers): threads per worker set how many requests wait concurrently
+exec gunicorn --workers "$WORKERS" --threads "${GUNICORN_THREADS:-4}" --timeout 120 --bind "0.0.0.0:${PORT}" app:app
@@ -0,0 +1,71 @@
+"""
+POST /api/admin/exercises/bulk through the streaming (ijson) parser: the request body is read from
+Werkzeug's LimitedStream, which must not see ijson's read(0) probe as a client disconnect.
+Run from backend dir: python test_bulk_exercises_ijson.py (or pytest). Uses a throwaway SQLite DB.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+_db_dir = tempfile.mkdtemp(prefix='insightgym-test-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_db_dir, 'test.db')
+os.environ['TRIAL_NOTIFICATION_INTERVAL'] = '0'
+os.environ.pop('REDIS_URL', None)
+
+
+def _exercise(n):
+    return {
+        'category': 'bodybuilding_machine',
+        'name_fa': f'حرکت آزمایشی {n}',
+        'name_en': f'Bulk test exercise {n}',
+        'target_muscle_fa': 'سینه',
+        'target_muscle_en': 'Chest',
+        'level': 'beginner',
+        'intensity': 'medium',
+        'gender_suitability': 'both',
+    }
+
+
+def test_bulk_create_streams_with_ijson():
+    from app import app, db, User, ensure_db_initialized
+    from api import admin_api
+    from flask_jwt_extended import create_access_token
+    from services.passwords import hash_password
+
+    if not admin_api.HAS_IJSON:
+        print("SKIPPED: ijson is not installed")
+        return
+
+    with app.app_context():
+        ensure_db_initialized()
+        admin = User(username='bulk_admin', email='bulk_admin@example.com', password_hash=hash_password('x'), role='admin')
+        db.session.add(admin)
+        db.session.commit()
+        token = create_access_token(identity=str(admin.id), additional_claims={'role': 'admin'})
+
+    body = json.dumps({'exercises': [_exercise(n) for n in range(3)]}).encode('utf-8')
+    resp = app.test_client().post(
+        '/api/admin/exercises/bulk',
+        data=body,
+        content_type='application/json',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert resp.status_code == 201, resp.get_data(as_text=True)
+    out = resp.get_json()
+    assert len(out['created']) == 3, out
+    assert out['errors'] == [], out
+
+
+def main():
+    test_bulk_create_streams_with_ijson()
+    print("SUCCESS: bulk exercise import streamed with ijson")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
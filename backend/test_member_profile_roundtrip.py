@@ -0,0 +1,75 @@
+"""
+Round-trip the JSON list profile fields through the admin API: PUT /api/admin/members/<id>/profile,
+then GET /api/admin/members/<id> must return the same lists (they are stored once, not double-encoded).
+Run from backend dir: python test_member_profile_roundtrip.py (or pytest). Uses a throwaway SQLite DB.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+_db_dir = tempfile.mkdtemp(prefix='insightgym-test-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_db_dir, 'test.db')
+os.environ['TRIAL_NOTIFICATION_INTERVAL'] = '0'
+os.environ.pop('REDIS_URL', None)
+
+PROFILE_LISTS = {
+    'fitness_goals': ['weight_loss', 'strength'],
+    'injuries': ['knee'],
+    'medical_conditions': [],
+    'equipment_access': ['machine', 'dumbbells'],
+    'home_equipment': ['resistance_bands'],
+}
+
+
+def _setup():
+    from app import app, db, User, ensure_db_initialized
+    from flask_jwt_extended import create_access_token
+    from services.passwords import hash_password
+
+    with app.app_context():
+        ensure_db_initialized()
+        admin = User(username='rt_admin', email='rt_admin@example.com', password_hash=hash_password('x'), role='admin')
+        member = User(username='rt_member', email='rt_member@example.com', password_hash=hash_password('x'), role='member')
+        db.session.add_all([admin, member])
+        db.session.commit()
+        token = create_access_token(identity=str(admin.id), additional_claims={'role': 'admin'})
+        return app, token, member.id
+
+
+def test_member_profile_lists_round_trip():
+    from sqlalchemy import text
+    from app import db
+
+    app, token, member_id = _setup()
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+
+    resp = client.put(f'/api/admin/members/{member_id}/profile', json=PROFILE_LISTS, headers=headers)
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+
+    resp = client.get(f'/api/admin/members/{member_id}', headers=headers)
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+    profile = resp.get_json()['profile']
+    for key, expected in PROFILE_LISTS.items():
+        assert profile[key] == expected, (key, profile[key])
+
+    # Stored as a plain JSON array, not a JSON string holding one
+    with app.app_context():
+        raw = db.session.execute(
+            text('SELECT fitness_goals FROM user_profiles WHERE user_id = :id'), {'id': member_id}
+        ).scalar()
+    assert raw.startswith('['), raw
+
+
+def main():
+    test_member_profile_lists_round_trip()
+    print("SUCCESS: profile lists round-trip through PUT/GET unchanged")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
@@ -3,7 +3,6 @@ Update profile using Flask app context and SQLAlchemy.
 Works with PostgreSQL or SQLite via DATABASE_URL.
 """
 
-import json
 import os
 import sys
 import codecs
@@ -42,7 +41,7 @@ def update_profile():
         profile.set_fitness_goals(['weight_loss', 'muscle_gain'])
         profile.set_injuries([])
         profile.injury_details = ''
-        profile.medical_conditions = json.dumps([], ensure_ascii=False)
+        profile.set_medical_conditions([])
         profile.medical_condition_details = ''
         profile.exercise_history_years = 3
         profile.exercise_history_description = 'Regular gym workouts for 3 years'
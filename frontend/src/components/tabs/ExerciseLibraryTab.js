@@ -127,7 +127,7 @@ const ExerciseLibraryTab = () => {
   const fetchExercises = useCallback(async () => {
     try {
       setLoading(true);
-      const params = new URLSearchParams({ page: String(page), per_page: '20' });
+      const params = new URLSearchParams({ page: String(page), per_page: '20', view: 'summary' });
       if (categoryFilter) params.set('category', categoryFilter);
       if (levelFilter) params.set('level', levelFilter);
       const response = await axios.get(
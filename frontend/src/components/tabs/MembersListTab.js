@@ -38,11 +38,16 @@ const homeEquipmentOptions = [
   { value: 'body_weight_only', label_fa: 'فقط وزن بدن', label_en: 'Body Weight Only' }
 ];
 
+// Members are fetched in keyset pages of this size (GET /api/admin/members?limit=&cursor=)
+const MEMBERS_PAGE_SIZE = 100;
+
 const MembersListTab = () => {
   const { i18n } = useTranslation();
   const API_BASE = getApiBase();
   const { user } = useAuth();
   const [members, setMembers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [assistants, setAssistants] = useState([]);
   const [loading, setLoading] = useState(false);
   const [editingMember, setEditingMember] = useState(null);
@@ -70,8 +75,12 @@ const MembersListTab = () => {
   const fetchMembers = useCallback(async () => {
     try {
       setLoading(true);
-      const response = await axios.get(`${API_BASE}/api/admin/members`, getAxiosConfig());
-      setMembers(response.data);
+      const response = await axios.get(`${API_BASE}/api/admin/members`, {
+        ...getAxiosConfig(),
+        params: { limit: MEMBERS_PAGE_SIZE }
+      });
+      setMembers(response.data.items);
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       console.error('Error fetching members:', error);
       alert(i18n.language === 'fa' ? 'خطا در دریافت لیست اعضا' : 'Error fetching members');
@@ -80,6 +89,24 @@ const MembersListTab = () => {
     }
   }, [API_BASE, getAxiosConfig, i18n.language]);
 
+  const loadMoreMembers = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const response = await axios.get(`${API_BASE}/api/admin/members`, {
+        ...getAxiosConfig(),
+        params: { limit: MEMBERS_PAGE_SIZE, cursor: nextCursor }
+      });
+      setMembers(prev => [...prev, ...response.data.items]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error('Error fetching members:', error);
+      alert(i18n.language === 'fa' ? 'خطا در دریافت لیست اعضا' : 'Error fetching members');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const fetchAssistants = useCallback(async () => {
     try {
       const response = await axios.get(`${API_BASE}/api/admin/assistants`, getAxiosConfig());
@@ -311,6 +338,16 @@ const MembersListTab = () => {
             </table>
           </div>
 
+          {nextCursor && (
+            <div className="members-load-more">
+              <button className="btn-load-more" onClick={loadMoreMembers} disabled={loadingMore}>
+                {loadingMore
+                  ? (i18n.language === 'fa' ? 'در حال بارگذاری...' : 'Loading...')
+                  : (i18n.language === 'fa' ? 'نمایش بیشتر' : 'Load more')}
+              </button>
+            </div>
+          )}
+
           {editingMember && (
             <div className="admin-form-overlay">
               <div className="admin-form-container" style={{ maxHeight: '90vh', overflowY: 'auto' }}>